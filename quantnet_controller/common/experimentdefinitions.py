@@ -58,7 +58,7 @@ class Experiment(metaclass=ABCMeta):
 
     @property
     @abstractmethod
-    # List of AgentSequences classes to be used for an Experiment
+    # Tuple of AgentSequences classes to be used for an Experiment
     def agent_sequences(self):
         pass
 
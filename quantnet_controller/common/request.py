@@ -152,12 +152,15 @@ class RequestManager:
     :type _shared_db_handler: Any
     :cvar _shared_active_requests: In‑memory store of active :class:`Request` objects.
     :type _shared_active_requests: dict[str, Request]
+    :cvar _shared_latest_requests: Identifier of the newest request per request type.
+    :type _shared_latest_requests: dict[str, str]
     """
 
     _instances = {}  # Plugin-specific instances: {plugin_key: RequestManager}
     _lock = asyncio.Lock()
     _shared_db_handler = None  # Shared DB handler for all requests
     _shared_active_requests = {}  # Shared in-memory tracking: {rid: Request}
+    _shared_latest_requests = {}  # Newest request per type: {type: rid}
 
     def __new__(cls, ctx, plugin_schema=None, request_type=RequestType.PROTOCOL, dbname=None, exp_def_path=None):
         """
@@ -227,6 +230,7 @@ class RequestManager:
         # Use shared DB handler and active requests
         self.db_handler = RequestManager._shared_db_handler
         self._active_requests = RequestManager._shared_active_requests
+        self._latest_requests = RequestManager._shared_latest_requests
 
         # Initialize translator for experiment-type requests
         if request_type == RequestType.EXPERIMENT or request_type == RequestType.CALIBRATION:
@@ -313,6 +317,7 @@ class RequestManager:
 
         # Store in shared memory and DB
         self._active_requests[request.id] = request
+        self._latest_requests[request.type] = request.id
         self.db_handler.add(request.to_dict())
 
         logger.info(f"Created new request {request.id} of type {self.request_type}")
@@ -423,6 +428,35 @@ class RequestManager:
                 requests.append(request)
         return requests
 
+    async def get_latest(self, raw=False):
+        """
+        Retrieve the most recently created request of this manager's request type.
+
+        The newest request identifier is tracked in memory as requests are created,
+        so the common case is served without querying the database. The database
+        is only consulted when the request is no longer tracked (e.g. after a restart).
+
+        :param raw: When ``True``, return the request as a dictionary
+        :type raw: bool
+
+        :returns: The newest :class:`Request`, or ``None`` if there is none
+        :rtype: Request | dict | None
+        """
+        rid = self._latest_requests.get(self.request_type.value)
+        if rid in self._active_requests:
+            req = self._active_requests[rid]
+            return req.to_dict() if raw else req
+
+        records = await self.find_requests(
+            raw=True, filter={"type": self.request_type.value}, limit=1, sort={"created_at": -1}
+        )
+        if not records:
+            return None
+        self._latest_requests[self.request_type.value] = records[0]["id"]
+        if raw:
+            return records[0]
+        return await self.get_request(records[0]["id"], include_result=True)
+
     def del_request(self, rid):
         """
         Remove a request from both in‑memory tracking and persistent storage.
@@ -436,6 +470,9 @@ class RequestManager:
         # Remove from shared memory
         if rid in self._active_requests:
             del self._active_requests[rid]
+        for rtype, latest in list(self._latest_requests.items()):
+            if latest == rid:
+                del self._latest_requests[rtype]
 
         # Remove from DB
         result = self.db_handler.delete({"id": rid})
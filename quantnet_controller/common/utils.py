@@ -19,7 +19,7 @@ from urllib.parse import urlparse, urlencode, quote, parse_qsl, urlunparse
 from quantnet_controller.common.config import config_get
 from quantnet_controller.common.extra import import_extras
 
-EXTRA_MODULES = import_extras(["paramiko"])
+EXTRA_MODULES = import_extras(["paramiko", "orjson"])
 
 if EXTRA_MODULES["paramiko"]:
     try:
@@ -140,6 +140,15 @@ def parse_response(data):
     return json.loads(data, object_hook=datetime_parser)
 
 
+def json_loads(data):
+    """
+    Deserialize a JSON document (str or bytes), using orjson when it is available
+    """
+    if EXTRA_MODULES["orjson"]:
+        return EXTRA_MODULES["orjson"].loads(data)
+    return json.loads(data)
+
+
 def execute(cmd) -> Tuple[int, str, str]:
     """
     Executes a command in a subprocess. Returns a tuple
@@ -1,3 +1,5 @@
+import threading
+from functools import wraps
 from quantnet_controller.db.broker import broker as db_broker, Broker
 
 
@@ -9,12 +11,33 @@ class DBmodel():
     Blob = "Blob"
 
 
+def writes(func):
+    """ Decorate a database call that modifies data so cached reads of its model can be invalidated
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            model = args[0] if args else kwargs.get("model")
+            with AbstractDatabase._version_lock:
+                if model is None:
+                    # No model, e.g. drop_database, invalidates them all
+                    AbstractDatabase._epoch += 1
+                else:
+                    AbstractDatabase._versions[model] = AbstractDatabase._versions.get(model, 0) + 1
+    return wrapper
+
+
 class AbstractDatabase():
     """
     AbstractDatabase class
     """
 
     _instance = None
+    _epoch = 0
+    _versions = {}
+    _version_lock = threading.Lock()
 
     def __new__(cls):
         if cls._instance is None:
@@ -29,12 +52,18 @@ class AbstractDatabase():
         def add(self, data, **kwargs) -> dict:
             return self._db.add(self._model, data, **kwargs)
 
+        def add_many(self, data, **kwargs) -> list:
+            return self._db.add_many(self._model, data, **kwargs)
+
         def get(self, id, **kwargs) -> dict | None:
             return self._db.get(self._model, id, **kwargs)
 
         def find(self, **kwargs) -> list:
             return self._db.find(self._model, **kwargs)
 
+        def count(self, **kwargs) -> int:
+            return self._db.count(self._model, **kwargs)
+
         def update(self, id, key, value, **kwargs) -> bool:
             return self._db.update(self._model, id, key, value, **kwargs)
 
@@ -50,6 +79,12 @@ class AbstractDatabase():
         def drop(self, **kwargs) -> None:
             return self._db.drop(self._model, **kwargs)
 
+    def version(self, model) -> int:
+        """
+        return a counter bumped on every write to the model made through this process
+        """
+        return AbstractDatabase._epoch + AbstractDatabase._versions.get(model, 0)
+
     def handler(self, model=DBmodel.Blob):
         """
         return the table handler
@@ -64,18 +99,21 @@ class AbstractDatabase():
         return broker
 
     @staticmethod
+    @writes
     @db_broker
     def drop_database(broker: Broker, **kwargs):
         """ Drop the entire DB """
         return broker.drop_database(model=None, **kwargs)
 
     @staticmethod
+    @writes
     @db_broker
     def drop(model, broker: Broker, **kwargs):
         """ Drop the current model (collection) """
         return broker.drop(model, **kwargs)
 
     @staticmethod
+    @writes
     @db_broker
     def add(model, data, broker: Broker, **kwargs):
         """ Insert data into the database table or collection.
@@ -96,6 +134,28 @@ class AbstractDatabase():
         """
         return broker.add(model, data, **kwargs)
 
+    @staticmethod
+    @writes
+    @db_broker
+    def add_many(model, data, broker: Broker, **kwargs):
+        """ Insert a list of records into the database table or collection in one bulk operation.
+
+        :param model: table or collection.
+        :type model: enum DBModel
+        :param data: data to insert
+        :type data: list of dicts
+        :return: the inserted data
+        :rtype: list of dicts
+
+        **Example:**
+
+        .. code-block:: python
+
+            add_many(DBmodel.Blob, [{"name":"alice", "remote":"bob"}, {"name":"bob", "remote":"alice"}])
+
+        """
+        return broker.add_many(model, data, **kwargs)
+
     @staticmethod
     @db_broker
     def get(model, id, broker: Broker, **kwargs):
@@ -139,6 +199,27 @@ class AbstractDatabase():
 
     @staticmethod
     @db_broker
+    def count(model, broker: Broker, **kwargs) -> int:
+        """ Count the records of the database table or collection without fetching them.
+
+        :param model: table or collection
+        :type model: enum DBModel
+        :return: number of records
+        :rtype: int
+
+        **Example:**
+
+        .. code-block:: python
+
+            count(DBmodel.Blob)
+            count(DBmodel.Blob, filter={"name":"alice"})
+
+        """
+        return broker.count(model, **kwargs)
+
+    @staticmethod
+    @writes
+    @db_broker
     def update(model, id, key, value, broker: Broker, **kwargs):
         """ Update with {key:value} the database table or collection based on the id.
             If nothing matching the id, nothing happens.
@@ -162,6 +243,7 @@ class AbstractDatabase():
         return broker.update(model, id, key, value, **kwargs)
 
     @staticmethod
+    @writes
     @db_broker
     def upsert(model, id, *args, broker: Broker, **kwargs):
         """ It updates a record if exists or adds a new record if it does not.
@@ -185,6 +267,7 @@ class AbstractDatabase():
         return broker.upsert(model, id, *args, **kwargs)
 
     @staticmethod
+    @writes
     @db_broker
     def delete(model, id, broker: Broker, **kwargs):
         """ Remove records from the database table or collection, with the option to filter by "id".
@@ -2,6 +2,7 @@
 Resource Manager
 """
 
+import copy
 import json
 import logging
 import types
@@ -15,11 +16,24 @@ logger = logging.getLogger(__name__)
 
 
 class ResourceManager:
-    def __init__(self, rtype="nodes", key="agentId", **kwargs):
+    def __init__(self, rtype="nodes", key="agentId", cache=False, **kwargs):
         self._topo = None
         self._node_db = DB().handler(DBmodel.Node)
         self._request_db = DB().handler(DBmodel.Request)
         self._is_topo_updated = False
+        # Opt-in cache of the node documents read from the DB, valid until the next Node write
+        # made through this process; writes from other processes are not seen
+        self._cache = cache
+        self._node_cache = {}
+        self._find_cache = None
+        self._cache_version = None
+
+    def _check_cache(self):
+        version = DB().version(DBmodel.Node)
+        if version != self._cache_version:
+            self._node_cache = {}
+            self._find_cache = None
+            self._cache_version = version
 
     def node_loader(self, data=None):
         typ = data["systemSettings"]["type"]
@@ -61,7 +75,19 @@ class ResourceManager:
     def find_nodes(self, params=dict(), **kwargs):
         try:
             rdict = kwargs.pop("dict", False)
-            nodes = self._node_db.find(filter=params, **kwargs)
+            key = None
+            if self._cache and not kwargs:
+                self._check_cache()
+                try:
+                    key = frozenset(params.items())
+                except TypeError:
+                    pass
+            if key is not None and self._find_cache and self._find_cache[0] == key:
+                nodes = copy.deepcopy(self._find_cache[1])
+            else:
+                nodes = self._node_db.find(filter=params, **kwargs)
+                if key is not None:
+                    self._find_cache = (key, copy.deepcopy(nodes))
             if rdict:
                 return nodes
             ret = list()
@@ -74,8 +100,14 @@ class ResourceManager:
 
     def get_nodes(self, *nnames):
         ret = list()
+        if self._cache:
+            self._check_cache()
         for n in nnames:
-            node = self._node_db.get({"systemSettings.ID": str(n)})
+            node = self._node_cache.get(str(n)) if self._cache else None
+            if node is None:
+                node = self._node_db.get({"systemSettings.ID": str(n)})
+                if node and self._cache:
+                    self._node_cache[str(n)] = node
             if not node:
                 raise Exception(f"Node not found: {n}")
             ret.append(self.node_loader(node))
@@ -53,12 +53,26 @@ class Broker(object, metaclass=abc.ABCMeta):
     def add(self, model, data, **kwargs):
         return self._get_hndl(model).add(data, **kwargs)
 
+    def add_many(self, model, data, **kwargs):
+        hndl = self._get_hndl(model)
+        # Fall back to one add() per record for handlers without a bulk insert
+        if hasattr(hndl, "add_many"):
+            return hndl.add_many(data, **kwargs)
+        return [hndl.add(d, **kwargs) for d in data]
+
     def get(self, model, id, **kwargs):
         return self._get_hndl(model).get(id, **kwargs)
 
     def find(self, model, **kwargs):
         return self._get_hndl(model).find(**kwargs)
 
+    def count(self, model, **kwargs):
+        hndl = self._get_hndl(model)
+        # Fall back to counting the found records for handlers without a count query
+        if hasattr(hndl, "count"):
+            return hndl.count(**kwargs)
+        return len(hndl.find(**kwargs))
+
     def update(self, model, id, key, value, **kwargs):
         return self._get_hndl(model).update(id, key, value, **kwargs)
 
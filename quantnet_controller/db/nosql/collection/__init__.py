@@ -13,6 +13,8 @@ class Collection:
     # Otherwise, a new internal '_id' will be generated but
     # will not be exposed to user.
     _keyname = "_id"
+    # Fields queried often enough to need an index, besides '_id'
+    _indexes = ()
 
     def __init__(self, model="default"):
         self._collection_name = model if model else "default"
@@ -25,10 +27,10 @@ class Collection:
             key = Collection._keyname
             global _DATABASE
             if _DATABASE:
-                layer = _DATABASE.get_db_layer(self._collection_name, key)
+                layer = _DATABASE.get_db_layer(self._collection_name, key, self._indexes)
             else:
                 _DATABASE = DBLoader(**kwargs)
-                layer = _DATABASE.get_db_layer(self._collection_name, key)
+                layer = _DATABASE.get_db_layer(self._collection_name, key, self._indexes)
             return func(self, *args, **kwargs, layer=layer)
         return wrapper
 
@@ -45,6 +47,19 @@ class Collection:
         except Exception:
             raise
 
+    @layer
+    def add_many(self, data, layer=None, **kwargs) -> list:
+        for d in data:
+            if not isinstance(d, dict):
+                raise Exception(f"Type error: {d} is not dict")
+        if not data:
+            return []
+        try:
+            # Like add(), only return the documents that were newly inserted
+            return [data[i] for i in layer.insert_many(data)]
+        except Exception:
+            raise
+
     @layer
     def find(self, layer=None, **kwargs):
         try:
@@ -53,6 +68,14 @@ class Collection:
         except Exception:
             raise
 
+    @layer
+    def count(self, layer=None, **kwargs) -> int:
+        try:
+            q = kwargs.pop("filter", {})
+            return layer.count(q, **kwargs)
+        except Exception:
+            raise
+
     @layer
     def get(self, id, layer=None, **kwargs):
         """ Get the documents from the collection. It allows filtering based on "id"
@@ -120,7 +143,7 @@ class Collection:
     @layer
     def exist(self, id, layer=None, **kwargs):
         filter = {self._keyname: id} if not isinstance(id, dict) else id
-        return True if layer.find_one(filter) else False
+        return layer.exists(filter)
 
     @layer
     def drop(self, layer=None, **kwargs):
@@ -6,5 +6,7 @@ from quantnet_controller.db.nosql.collection import Collection
 
 
 class Calibration(Collection):
+    _indexes = ("id",)
+
     def __init__(self):
         self._collection_name = "calibrations"
@@ -4,6 +4,7 @@ import importlib
 import sys
 
 from bson.objectid import ObjectId
+from pymongo import ReplaceOne
 from quantnet_controller.common.config import config_get
 from quantnet_controller.common.utils import get_uri_path
 
@@ -17,18 +18,23 @@ class DBLayer(object):
     network resource id and the revision number (timestamp).
     """
 
-    def __init__(self, client, collection_name, capped=False, Id="id", timestamp="ts", *, history=False):
+    def __init__(self, client, collection_name, capped=False, Id="id", timestamp="ts", *, history=False, indexes=()):
         self.log = logging.getLogger(__name__)
         self.Id = Id
         self.timestamp = timestamp
         self.history, self.capped = history, capped
         self._collection_name = collection_name
         self._client = client
+        self._collection = None
+        self._indexes = indexes
+        self._indexed = False
 
     @property
     def collection(self):
         """Returns a reference to the default mongodb collection."""
-        return self._client[self._collection_name]
+        if self._collection is None:
+            self._collection = self._client[self._collection_name]
+        return self._collection
 
     @property
     def manifest(self):
@@ -42,6 +48,17 @@ class DBLayer(object):
         result = self.collection.find_one(query, projection=fields, **kwargs)
         return result
 
+    def ensure_indexes(self):
+        """Creates the secondary indexes of the collection, unless done already."""
+        if not self._indexed:
+            for key in self._indexes:
+                self.collection.create_index(key)
+            self._indexed = True
+
+    def exists(self, query={}):
+        """Checks for a matching element, fetching only its _id."""
+        return self.collection.find_one(query, projection={"_id": 1}) is not None
+
     def count(self, query={}, **kwargs):
         skip = kwargs.get("skip", 0)
         if "limit" in kwargs:
@@ -78,6 +95,26 @@ class DBLayer(object):
                 results.append(self.collection.replace_one({self.Id: rid}, item, upsert=True))
         return results
 
+    def insert_many(self, data, **kwargs):
+        """Inserts a list of documents to the collection in a single bulk request.
+
+        Returns the sorted indices, in data, of the documents that were newly inserted.
+        """
+        self.log.debug(f"Insert many for collection: [{self._collection_name}")
+        if not self.capped:
+            for item in data:
+                self._insert_id(item)
+
+        if self.history:
+            # Every revision is a new document, insert_many raises if any is rejected
+            self.collection.insert_many(data, ordered=False, **kwargs)
+            return list(range(len(data)))
+        requests = [ReplaceOne({self.Id: item.get(self.Id, str(ObjectId()))}, item, upsert=True) for item in data]
+        result = self.collection.bulk_write(requests, ordered=False, **kwargs)
+        # Match the upserted _ids back to the documents, mongomock misreports the request indices
+        upserted = set(result.upserted_ids.values())
+        return [i for i, item in enumerate(data) if item.get("_id") in upserted]
+
     def upsert(self, query, data):
         return self.collection.replace_one(query, data, upsert=True)
 
@@ -102,6 +139,7 @@ class DBLayer(object):
 
     def drop(self, **kwargs):
         self.collection.drop()
+        self._indexed = False
 
     def drop_database(self, **kwargs):
         self._client.db.command("dropDatabase")
@@ -116,6 +154,7 @@ class DBLoader:
         self._host = kwargs.get("host")
         self._port = kwargs.get("port")
         self._dbname = kwargs.get("dbname", "quantnet")
+        self._layers = {}
         self._db = self._init()
 
     @property
@@ -148,9 +187,15 @@ class DBLoader:
 
     def drop_database(self, **kwargs):
         self._conn.drop_database(self._dbname)
+        self._layers.clear()
 
-    def get_db_layer(self, collection_name, id_field_name):
+    def get_db_layer(self, collection_name, id_field_name, indexes=()):
         if not collection_name:
             return None
-        db_layer = DBLayer(self.db, collection_name, False, id_field_name)
+        # Reuse the layer, and its collection handle, for every call on the same collection
+        key = (collection_name, id_field_name)
+        db_layer = self._layers.get(key)
+        if db_layer is None:
+            db_layer = self._layers[key] = DBLayer(self.db, collection_name, False, id_field_name, indexes=indexes)
+        db_layer.ensure_indexes()
         return db_layer
@@ -85,9 +85,9 @@ def calibration_exists(id, include_deleted=False, *, session: "Session"):
     """
 
     if include_deleted is True:
-        query = session.query(models.Calibration).filter_by(id=id)
+        query = session.query(models.Calibration.id).filter_by(id=id)
     else:
-        query = session.query(models.Calibration).filter_by(id=id, status=NodeStatus.ACTIVE)
+        query = session.query(models.Calibration.id).filter_by(id=id, status=NodeStatus.ACTIVE)
 
     try:
         ret = query.first()
@@ -84,9 +84,9 @@ def pingpong_exists(id, include_deleted=False, *, session: "Session"):
     """
 
     if include_deleted is True:
-        query = session.query(models.PingPong).filter_by(id=id)
+        query = session.query(models.PingPong.id).filter_by(id=id)
     else:
-        query = session.query(models.PingPong).filter_by(id=id, status=NodeStatus.ACTIVE)
+        query = session.query(models.PingPong.id).filter_by(id=id, status=NodeStatus.ACTIVE)
 
     try:
         ret = query.first()
@@ -17,4 +17,4 @@ class EGPQnodeSequence(AgentSequences):
 
 class SimpleExperiment(Experiment):
     name = "Simple Experiment"
-    agent_sequences = [EGPQnodeSequence]
+    agent_sequences = (EGPQnodeSequence,)
@@ -7,7 +7,6 @@ from quantnet_mq.schema.models import (
     agentCalibrationResponse,
     Status as responseStatus,
 )
-from calibrator import Calibrator
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +26,7 @@ class CalibrationProtocol(ProtocolPlugin):
         ]
         self._msg_commands = list()
         self.ctx = context
-        self._calibrator = Calibrator(context.config, context.rpcclient, context.msgclient)
+        self._calibrator = None
         self.request_manager = RequestManager(
             context, plugin_schema=agentCalibrationResponse, request_type=RequestType.CALIBRATION
         )
@@ -35,8 +34,10 @@ class CalibrationProtocol(ProtocolPlugin):
     def initialize(self):
         pass
 
-    def destroy(self):
-        pass
+    async def destroy(self):
+        """Publish the calibration phases still buffered"""
+        if self._calibrator is not None:
+            await self._calibrator.close()
 
     def reset(self):
         pass
@@ -45,11 +46,13 @@ class CalibrationProtocol(ProtocolPlugin):
         """handle calibration"""
         logger.info(f"Received calibration: {request.serialize()}")
         rc = 0
+        params = request.payload.parameters
         if request.payload.type == "calibrate":
+            p = params.as_dict()
             parameters = RequestParameter(
                 exp_name="Calibration",
-                path=[request.payload.parameters["src"]._value, request.payload.parameters["dst"]._value],
-                exp_params=request.payload.parameters.as_dict(),
+                path=[p["src"], p["dst"]],
+                exp_params=p,
             )
             req = self.request_manager.new_request(
                 payload=request.payload, parameters=parameters)
@@ -60,18 +63,15 @@ class CalibrationProtocol(ProtocolPlugin):
                 calibrations=[
                     {
                         "phase": "Initializing",
-                        "type": request.payload.parameters["type"],
-                        "src": request.payload.parameters["src"],
-                        "dst": request.payload.parameters["dst"],
-                        "power": request.payload.parameters["power"],
-                        "light": request.payload.parameters["cal_light"],
+                        **{k: p[k] for k in ("type", "src", "dst", "power")},
+                        "light": p["cal_light"],
                         "start_ts": time.time(),
                         "id": req.id,
                     }
                 ],
             )
         elif request.payload.type == "get":
-            exp_id = request.payload.parameters.get("id")
+            exp_id = params.get("id")
             if exp_id:
                 calibs = await self.request_manager.get_request(exp_id, raw=True)
                 calibs = [calibs.to_dict()] if calibs else []
@@ -81,11 +81,9 @@ class CalibrationProtocol(ProtocolPlugin):
                 )
             return agentCalibrationResponse(status=responseStatus(code=rc, value=Code(rc).name), calibrations=calibs)
         elif request.payload.type == "getLast":
-            calibs = await self.request_manager.find_requests(
-                filter={"type": RequestType.CALIBRATION.value}, raw=True, **{"limit": 1, "sort": {"created_at": -1}}
-            )
+            calib = await self.request_manager.get_latest(raw=True)
             return agentCalibrationResponse(
-                status=responseStatus(code=rc, value=Code(rc).name), calibrations=calibs.to_dict()
+                status=responseStatus(code=rc, value=Code(rc).name), calibrations=[calib] if calib else []
             )
         else:
             raise Exception(f"unknown calibration type {request.payload.type}")
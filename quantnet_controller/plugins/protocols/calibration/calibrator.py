@@ -2,29 +2,35 @@
 
 import logging
 import asyncio
-import json
 import time
 from quantnet_controller.core import AbstractDatabase as DB, DBmodel
+from quantnet_controller.common.utils import json_loads
 
 log = logging.getLogger(__name__)
 
 
 class Calibrator:
     def __init__(self, config, rpcclient, msgclient, rtype="calibrations", key="agentId", **kwargs):
-        self._calibration_tasks = []
+        self._calibration_tasks = set()
         self._rpcclient = rpcclient
         self._msgclient = msgclient
         self._rpc_topic_prefix = config.rpc_client_topic
         self._handler = DB().handler(DBmodel.Calibration)
+        self._phase_buffer = {}
+        self._phase_flush_task = None
+        self._phase_flush_interval = 0.05
+        self._phase_lock = asyncio.Lock()
 
     async def start_calibration(self, parameters):
+        qn = "Calibrator.start_calibration"
         cal_id = parameters.get("id")
         cal_type = parameters.get("type")
         src = parameters.get("src")
         dst = parameters.get("dst")
         power = parameters.get("power")
         light = parameters.get("cal_light")
-        msgtopic = f"calibration-{cal_id}"
+        src_topic = f"{self._rpc_topic_prefix}/{src}"
+        dst_topic = f"{self._rpc_topic_prefix}/{dst}"
 
         """Thread to execute calibration process"""
         try:
@@ -39,56 +45,93 @@ class Calibrator:
                 "start_ts": time.time(),
                 "end_ts": 0
             }
-            self._handler.add(data)
+            await asyncio.to_thread(self._handler.add, data)
 
-            srcresp, dstresp = await self.init(src, dst, power)
+            srcresp, dstresp = await self.init(src_topic, dst_topic, power)
             if srcresp["status"]["code"] != 0 or dstresp["status"]["code"] != 0:
-                raise Exception(
-                    f"{Calibrator.start_calibration.__qualname__}"
-                    f"init failed: src: {srcresp['status']}, dst: {dstresp['status']}"
-                )
-
-            self._handler.update({"id": cal_id}, key="phase", value="Calibrating")
-            await self._msgclient.publish(msgtopic, {"id": cal_id, "phase": "Calibrating"})
-            srcresp, dstresp = await self.calibrate(src, dst, light)
+                raise Exception(f"{qn}: init failed: src: {srcresp['status']}, dst: {dstresp['status']}")
+
+            await self._update(cal_id, phase="Calibrating")
+            self._publish_phase(cal_id, "Calibrating")
+            srcresp, dstresp = await self.calibrate(src_topic, dst_topic, light)
             if srcresp["status"]["code"] != 0 or dstresp["status"]["code"] != 0:
-                raise Exception(
-                    f"{Calibrator.start_calibration.__qualname__}"
-                    f"calibrate failed: src: {srcresp['status']}, dst: {dstresp['status']}"
-                )
-
-            self._handler.update({"id": cal_id}, key="phase", value="Cleanup")
-            self._handler.update({"id": cal_id}, key="end_ts", value=time.time())
-            await self._msgclient.publish(msgtopic, {"id": cal_id, "phase": "Cleanup"})
-            srcresp, dstresp = await self.cleanup(src, dst)
+                raise Exception(f"{qn}: calibrate failed: src: {srcresp['status']}, dst: {dstresp['status']}")
+
+            await self._update(cal_id, phase="Cleanup", end_ts=time.time())
+            self._publish_phase(cal_id, "Cleanup")
+            srcresp, dstresp = await self.cleanup(src_topic, dst_topic)
             if srcresp["status"]["code"] != 0 or dstresp["status"]["code"] != 0:
-                raise Exception(
-                    f"{Calibrator.start_calibration.__qualname__}"
-                    f"cleanup failed: src: {srcresp['status']}, dst: {dstresp['status']}"
-                )
-
-            self._handler.update({"id": cal_id}, key="phase", value="Done")
-            self._handler.update({"id": cal_id}, key="end_ts", value=time.time())
-            await self._msgclient.publish(msgtopic, {"id": cal_id, "phase": "Done"})
+                raise Exception(f"{qn}: cleanup failed: src: {srcresp['status']}, dst: {dstresp['status']}")
+
+            await self._update(cal_id, phase="Done", end_ts=time.time())
+            await self._publish_terminal_phase(cal_id, "Done")
         except TimeoutError:
-            log.error(f"{Calibrator.start_calibration.__qualname__}: calibration requests timeout.")
-            self._handler.update(DBmodel.Calibration, cal_id, key="phase", value="Failed")
-            await self._msgclient.publish(msgtopic, {"id": cal_id, "phase": "Failed"})
+            log.error(f"{qn}: calibration requests timeout.")
+            await self._update(cal_id, phase="Failed")
+            await self._publish_terminal_phase(cal_id, "Failed")
         except Exception as e:
-            log.error(f"{Calibrator.start_calibration.__qualname__}: calibration failed: {e}")
-            self._handler.update({"id": cal_id}, key="phase", value="Failed")
-            await self._msgclient.publish(msgtopic, {"id": cal_id, "phase": "Failed"})
+            log.error(f"{qn}: calibration failed: {e}")
+            await self._update(cal_id, phase="Failed")
+            await self._publish_terminal_phase(cal_id, "Failed")
         finally:
             pass
         return
 
+    async def _update(self, cal_id, **fields):
+        """Update fields of a calibration record without blocking the event loop"""
+        def update():
+            for key, value in fields.items():
+                self._handler.update({"id": cal_id}, key=key, value=value)
+
+        await asyncio.to_thread(update)
+
+    def _publish_phase(self, cal_id, phase):
+        """Queue a phase update, coalescing updates published within one flush interval"""
+        self._phase_buffer[cal_id] = {"id": cal_id, "phase": phase}
+        if self._phase_flush_task is None or self._phase_flush_task.done():
+            self._phase_flush_task = asyncio.create_task(self._flush_phases())
+
+    async def _publish_terminal_phase(self, cal_id, phase):
+        """Publish the last phase of a calibration now, after the phases buffered, or being flushed, before it"""
+        async with self._phase_lock:
+            await self._publish_phases()
+            await self._publish(cal_id, {"id": cal_id, "phase": phase})
+
+    async def _flush_phases(self):
+        """Publish the newest buffered phase of each calibration, once per flush interval"""
+        while self._phase_buffer:
+            await asyncio.sleep(self._phase_flush_interval)
+            await self._publish_buffered()
+
+    async def _publish_buffered(self):
+        async with self._phase_lock:
+            await self._publish_phases()
+
+    async def _publish_phases(self):
+        phases, self._phase_buffer = self._phase_buffer, {}
+        for cal_id, msg in phases.items():
+            await self._publish(cal_id, msg)
+
+    async def _publish(self, cal_id, msg):
+        try:
+            await self._msgclient.publish(f"calibration-{cal_id}", msg)
+        except Exception as e:
+            log.error(f"failed to publish phase {msg['phase']} of calibration {cal_id}: {e}")
+
+    async def close(self):
+        """Publish the phases still buffered before shutting down"""
+        if self._phase_flush_task is not None:
+            await self._phase_flush_task
+        await self._publish_buffered()
+
     async def startCalibration(self, params):
         """Start a new calibration process"""
         log.info("starting calibration request")
 
         try:
             task = asyncio.create_task(self.start_calibration(params.as_dict()))
-            self._calibration_tasks.append(task)
+            self._calibration_tasks.add(task)
+            task.add_done_callback(self._calibration_tasks.discard)
         except Exception as e:
             raise Exception(f"calibraton failed between {params['src']} and {params['dst']}: {e.args}")
 
@@ -97,13 +140,13 @@ class Calibrator:
 
         if last:
             """get last calibration"""
-            res = self._handler.find({}, limit=1, sort={"created_at": -1})
+            res = await asyncio.to_thread(self._handler.find, limit=1, sort={"created_at": -1})
             return res[0] if res else None
         elif request.payload.parameters.get("id"):
             """return existing calibrations with given id"""
             cal_id = str(request.payload.parameters["id"])
-            if self._handler.exist({"id": cal_id}):
-                cal = self._handler.get({"id": cal_id})
+            cal = await asyncio.to_thread(self._handler.get, {"id": cal_id})
+            if cal:
                 return {
                     "phase": cal["phase"],
                     "src": cal["src"],
@@ -121,47 +164,35 @@ class Calibrator:
             log.error("Unimplemented calibration query")
             return dict()
         else:
-            return self._handler.find()
+            return await asyncio.to_thread(self._handler.find)
 
-    async def init(self, src, dst, power, timeout=50.0):
-        log.info("Sending Calibration initialization")
-        rpc_topic_prefix = self._rpc_topic_prefix
-        init_tasks = []
+    async def _call(self, cmd, msg, topic, timeout):
+        """Send an RPC to an agent and return the decoded response"""
+        return json_loads(await self._rpcclient.call(cmd, msg, topic=topic, timeout=timeout))
 
-        init_tasks.append(
-            self._rpcclient.call(
-                "calibration.srcInit", {"power": power}, topic=f"{rpc_topic_prefix}/{src}", timeout=timeout
-            )
-        )
-        init_tasks.append(
-            self._rpcclient.call("calibration.dstInit", None, topic=f"{rpc_topic_prefix}/{dst}", timeout=timeout)
+    async def init(self, src_topic, dst_topic, power, timeout=50.0):
+        """Initialize both ends of the calibration concurrently.
+
+        Each agent serves its own RPC topic, so the srcInit and dstInit requests are
+        issued concurrently and awaited together rather than one after the other.
+        """
+        log.info("Sending Calibration initialization")
+        srcResp, dstResp = await asyncio.gather(
+            self._call("calibration.srcInit", {"power": power}, src_topic, timeout),
+            self._call("calibration.dstInit", None, dst_topic, timeout),
         )
-        result = await asyncio.gather(*init_tasks)
-        return json.loads(result[0]), json.loads(result[1])
+        return srcResp, dstResp
 
-    async def calibrate(self, src, dst, cal_light, timeout=50.0):
+    async def calibrate(self, src_topic, dst_topic, cal_light, timeout=50.0):
         log.info("Sending Calibration")
-        rpc_topic_prefix = self._rpc_topic_prefix
-        generationResp = self._rpcclient.call(
-            "calibration.generation", {"cal_light": cal_light}, topic=f"{rpc_topic_prefix}/{src}", timeout=timeout
-        )
-        generationResp = json.loads(await generationResp)
-        calibrateResp = self._rpcclient.call(
-            "calibration.calibration", {"cal_light": cal_light}, topic=f"{rpc_topic_prefix}/{dst}", timeout=timeout
-        )
-        calibrateResp = json.loads(await calibrateResp)
+        generationResp = await self._call("calibration.generation", {"cal_light": cal_light}, src_topic, timeout)
+        calibrateResp = await self._call("calibration.calibration", {"cal_light": cal_light}, dst_topic, timeout)
         return generationResp, calibrateResp
 
-    async def cleanup(self, src, dst, timeout=50.0):
-        rpc_topic_prefix = self._rpc_topic_prefix
+    async def cleanup(self, src_topic, dst_topic, timeout=50.0):
         log.info("Starting Calibration cleanup")
-        cleanup_tasks = []
-        cleanup_tasks.append(
-            self._rpcclient.call("calibration.cleanUp", None, topic=f"{rpc_topic_prefix}/{src}", timeout=timeout)
-        )
-        cleanup_tasks.append(
-            self._rpcclient.call("calibration.cleanUp", None, topic=f"{rpc_topic_prefix}/{dst}", timeout=timeout)
+        srcResp, dstResp = await asyncio.gather(
+            self._call("calibration.cleanUp", None, src_topic, timeout),
+            self._call("calibration.cleanUp", None, dst_topic, timeout),
         )
-
-        result = await asyncio.gather(*cleanup_tasks)
-        return json.loads(result[0]), json.loads(result[1])
+        return srcResp, dstResp
@@ -59,7 +59,7 @@ class CalibrationDstSequence(AgentSequences):
 
 class CalibrationExperiment(Experiment):
     name = "Calibration"
-    agent_sequences = [CalibrationSrcSequence, CalibrationDstSequence]
+    agent_sequences = (CalibrationSrcSequence, CalibrationDstSequence)
 
     def get_sequence(self, agent_index):
         return self.agent_sequences[agent_index]
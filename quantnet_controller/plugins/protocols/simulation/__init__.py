@@ -4,7 +4,6 @@ from quantnet_mq.schema.models import (
     agentSimulationResponse,
     Status as responseStatus,
 )
-from quantnet_controller.plugins.protocols.simulation.simulator import Simulator
 from quantnet_controller.common.utils import generate_uuid
 
 logger = logging.getLogger(__name__)
@@ -22,7 +21,7 @@ class SimulationPrtocol(ProtocolPlugin):
         ]
         self._msg_commands = list()
         self.ctx = context
-        self._simulator = Simulator(context.config, context.rpcclient)
+        self._simulator = None
 
     def initialize(self):
         pass
@@ -39,12 +38,13 @@ class SimulationPrtocol(ProtocolPlugin):
         rc = 0
         if request.payload.type == "simulate":
             simid = generate_uuid()  # You'll need to import this
+            params = request.payload.parameters
 
             parameters = {
                 "id": simid,
-                "name": request.payload.parameters.get("name"),
-                "src": request.payload.parameters.get("src"),
-                "params": request.payload.parameters,
+                "name": params.get("name"),
+                "src": params.get("src"),
+                "params": params,
             }
 
             rc = await self.ctx.request_middleware.schedule(parameters, "Simulation")
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import logging
-import json
+from quantnet_controller.common.utils import json_loads
 
 log = logging.getLogger(__name__)
 
@@ -13,15 +13,17 @@ class Simulator():
         self._rpc_topic_prefix = config.rpc_client_topic
 
     async def simulate(self, request, timeout=50.0):
-        name = request.payload.parameters.get("name")
-        agent = request.payload.parameters.get("src")
-        log.info(f"Sending Simulation request to {self._rpc_topic_prefix}/{agent} ")
+        params = request.payload.parameters
+        name = params.get("name")
+        agent = params.get("src")
+        topic = f"{self._rpc_topic_prefix}/{agent}"
+        log.info(f"Sending Simulation request to {topic} ")
         generationResp = self._rpcclient.call(
             "simulation.simulate",
             {"name": name,
              "params": {"purpose_id": 4, "number": 4}},
-            topic=f"{self._rpc_topic_prefix}/{agent}",
+            topic=topic,
             timeout=timeout
         )
-        generationResp = json.loads(await generationResp)
+        generationResp = json_loads(await generationResp)
         return generationResp
@@ -15,6 +15,14 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared HTTP session so repeated topology refreshes reuse the API connection
+_session = requests.Session()
+
+
+ENT_TYPES = frozenset(["QNode", "QRepeater", "QSwitch", "QRouter"])
+BSM_TYPES = frozenset(["BSMNode"])
+ROUTER_TYPES = frozenset(["QRepeater", "QRouter"])
+
 
 class RALG (Enum):
     shortest = "Shortest"
@@ -31,36 +39,16 @@ class NetworkRouting:
         return self.routing_algorithm(self._network, source, dest, **kwargs)
 
     def get_route_by_hops(self, source, dest, **kwargs):
-
-        def get_hops(lst):
-            return [(lst[i], lst[i+1]) for i in range(len(lst) - 1)]
-
-        # Get routes
-        result = self._get_route(source, dest, **kwargs)
-        routes = []
-        if isinstance(result, types.GeneratorType):
-            routes = list(self._get_route(source, dest))
-        else:
-            routes = [result]
-
         # Decompose each route into a sequence of hops
-        routes_hops = []
-        for route in routes:
-            routes_hops.append(get_hops(route))
-
-        return routes_hops
+        return [[(r[i], r[i + 1]) for i in range(len(r) - 1)] for r in self.get_routes(source, dest, **kwargs)]
 
     def get_routes(self, source, dest, **kwargs) -> list:
         """ Get a list of routes
         """
         result = self._get_route(source, dest, **kwargs)
-        routes = []
         if isinstance(result, types.GeneratorType):
-            routes = list(self._get_route(source, dest))
-        else:
-            routes = [result]
-
-        return routes
+            return list(result)
+        return [result]
 
     @property
     def routing_algorithm(self):
@@ -85,9 +73,17 @@ class NetworkGenerator:
 
     def reset(self):
         self._node_info_map = {}
+        self._is_ent = {}
+        self._is_bsm = {}
+        self._is_router = {}
         self._network_graph = None
+        self._undirected_graph = None
         self._ent_graph = None
+        self._ent_paths = []
         self._arp = {}
+        self._qnodes_cache = None
+        self._route_cache = {}
+        self._ent_link_nodes_cache = {}
 
     @property
     def graph(self):
@@ -113,10 +109,23 @@ class NetworkGenerator:
             self._ent_graph = self.transform_to_ent_graph(self.graph)
         return self._ent_graph
 
+    @property
+    def undirected_graph(self):
+        """ Return the undirected copy of the network graph, built once per topology.
+
+        Returns
+        -------
+        G : NetworkX graph
+        """
+        if self._undirected_graph is None:
+            self._undirected_graph = self.graph.to_undirected()
+        return self._undirected_graph
+
     def add_node(self, node):
         """ Add the given node to the arp dictionary.
         """
         self._arp[node["id"]] = node
+        self._qnodes_cache = None
         # self._update_network_graph(node)
 
     @property
@@ -127,10 +136,7 @@ class NetworkGenerator:
         -------
         nodes : list of node
         """
-        nodes = []
-        for k, _ in self._arp.items():
-            nodes.append(k)
-        return nodes
+        return list(self._arp)
 
     @property
     def qnodes(self):
@@ -140,13 +146,16 @@ class NetworkGenerator:
         -------
         nodes : list of node
         """
-        nodes = []
-        for k, _ in self._arp.items():
-            nodes.append(k) if self._node_info_map.get(k)["systemSettings"]["type"] == "QNode" else None
-        return nodes
+        if self._qnodes_cache is None:
+            self._qnodes_cache = [k for k in self._arp
+                                  if self._node_info_map.get(k)["systemSettings"]["type"] == "QNode"]
+        return list(self._qnodes_cache)
 
     def refresh_topology(self):
+        self._route_cache = {}
+        self._ent_link_nodes_cache = {}
         self._network_graph = self._create_from_topology(True)
+        self._undirected_graph = None
         self._ent_graph = self.transform_to_ent_graph(self.graph)
 
     def get_resources(self, route: list):
@@ -208,6 +217,13 @@ class NetworkGenerator:
             node_id = c["systemSettings"]["ID"]
             self._node_info_map.update({node_id: c})
 
+        # Classify the devices once for the graph transformations and route filtering
+        type_of = {n: c["systemSettings"]["type"] for n, c in self._node_info_map.items()}
+        self._is_ent = {n: t in ENT_TYPES for n, t in type_of.items()}
+        self._is_bsm = {n: t in BSM_TYPES for n, t in type_of.items()}
+        self._is_router = {n: t in ROUTER_TYPES for n, t in type_of.items()}
+        self._qnodes_cache = None
+
         return self._network_graph
 
     def _request_topology(self, local=False):
@@ -232,12 +248,12 @@ class NetworkGenerator:
         try:
             # retrieve the topology
             config = self._config
-            response = requests.get(f"{config.quantnet_api_base_url}/topology")
-            if response.json()["status"]["code"] != 0:
+            response = _session.get(f"{config.quantnet_api_base_url}/topology").json()
+            if response["status"]["code"] != 0:
                 raise Exception("API request for topology failed")
             else:
-                topology = {"nodes": response.json()["value"][0]["nodes"],
-                            "links": response.json()["value"][0]["links"]}
+                topology = {"nodes": response["value"][0]["nodes"],
+                            "links": response["value"][0]["links"]}
                 if not topology["nodes"] or not topology["links"]:
                     raise Exception("topology is empty")
 
@@ -270,11 +286,11 @@ class NetworkGenerator:
         try:
             # retrieve the node configurations
             config = self._config
-            response = requests.get(f"{config.quantnet_api_base_url}/node")
-            if response.json()["status"]["code"] != 0:
+            response = _session.get(f"{config.quantnet_api_base_url}/node").json()
+            if response["status"]["code"] != 0:
                 raise Exception("API request for node failed")
             else:
-                node_configs = response.json()["value"]
+                node_configs = response["value"]
                 if not node_configs:
                     raise Exception("nodes is empty")
 
@@ -282,12 +298,12 @@ class NetworkGenerator:
             import traceback
             traceback.print_exc()
             logger.error(f"error {e}")
-            raise Exception(f"{self._create_network.__qualname__}:{e}")
+            raise Exception(f"{self._request_nodeconfig.__qualname__}:{e}")
 
         return node_configs
 
     def get_nodes_in_ent_link(self, ent_link: tuple):
-        """ Return the edge property, nodes, of the given edge
+        """ Return the node paths of the given edge, looked up by the edge property path_idx
 
         :param ent_link: entanglement link
         :type ent_link: networkX edge
@@ -295,14 +311,24 @@ class NetworkGenerator:
         :rtype: list
 
         """
+        return [list(nodes) for nodes in self._ent_link_nodes(ent_link)]
+
+    def _ent_link_nodes(self, ent_link: tuple):
+        """ Return the node paths of the given edge as tuples, memoized per edge
+        """
+        nodes_list = self._ent_link_nodes_cache.get(ent_link)
+        if nodes_list is not None:
+            return nodes_list
+
         nodes_list = []
         data = self.ent_graph.get_edge_data(*ent_link)
         for k, v in data.items():
-            nodes = v.get("nodes")
+            nodes = self._ent_paths[v["path_idx"]]
             if ent_link[0] != nodes[0]:
                 nodes_list.append(nodes[::-1])
             else:
                 nodes_list.append(nodes)
+        self._ent_link_nodes_cache[ent_link] = nodes_list
         return nodes_list
 
     def transform_to_ent_graph(self, graph):
@@ -315,56 +341,34 @@ class NetworkGenerator:
         """
 
         # entangle,ent link to path map
-        ent_types = ["QNode", "QRepeater", "QSwitch", "QRouter"]
-        bsm_types = ["BSMNode"]
-        router_types = ["QRepeater", "QRouter"]
-        node_info_map = self._node_info_map
-
-        def get_device_type(n):
-            return node_info_map.get(n)["systemSettings"]["type"]
-
-        def is_ent_device(n):
-            return get_device_type(n) in ent_types
-
-        def is_bsm_device(n):
-            return get_device_type(n) in bsm_types
-
-        def is_router_device(n):
-            return get_device_type(n) in router_types
+        ent_paths = self._ent_paths = []
+        is_ent_device = self._is_ent.__getitem__
+        is_bsm_device = self._is_bsm.__getitem__
 
-        def generate_ent_links(bsm, g):
+        def generate_ent_links(bsm, g, pred_map):
             """ Generate entanglement links using the given bsm in the g
             """
 
-            def generate_bsm_tree(n, g):
-
-                def add_children_of(n, tree, g):
-                    if is_ent_device(n):
-                        return
-
-                    # Get the in edges to this node
-                    in_edges = g.in_edges(n, keys=True)
-
-                    # Extract the source nodes (neighbors)
-                    in_neighbors = set([source for source, target, _ in in_edges])
-
-                    # Add children recursively
-                    for neighbor in in_neighbors:
-                        # if not neighbor in tree and not is_bsm_device(neighbor):
-                        if not is_bsm_device(neighbor):
-                            # tree.add_node(neighbor)
-                            edges = [(src, dest, key) for src, dest, key in in_edges if src == neighbor]
-
-                            # Check existance
-                            for e in edges:
-                                if not tree.has_edge(*e):
-                                    tree.add_node(neighbor)
-                                    tree.add_edges_from(edges)
-                                    add_children_of(neighbor, tree, g)
-
+            def generate_bsm_tree(n, g, pred_map):
+                """ Walk the in-edges backwards, depth first, from n until entanglement devices are reached
+                """
+                # The discovery order decides the edge order of the ent graph, and so how
+                # shortest route ties are broken; keep it depth first. An explicit stack of
+                # neighbor iterators stands in for recursion so deep trees cannot exhaust it
                 tree = nx.MultiDiGraph()
                 tree.add_node(n)
-                add_children_of(n, tree, g)
+
+                stack = [] if is_ent_device(n) else [iter(pred_map[n])]
+                while stack:
+                    for neighbor, edges in stack[-1]:
+                        if not tree.has_edge(*edges[0]):
+                            tree.add_node(neighbor)
+                            tree.add_edges_from(edges)
+                            if not is_ent_device(neighbor):
+                                stack.append(iter(pred_map[neighbor]))
+                            break
+                    else:
+                        stack.pop()
 
                 return tree
 
@@ -383,58 +387,32 @@ class NetworkGenerator:
 
                     return full_path
 
-                def find_all_paths(t: Graph, leaf1, leaf2, root):
-
-                    # Find the path from leaf1 to the root
-                    paths1 = []
-                    for p in nx.all_simple_paths(t, source=leaf1, target=root):
-                        paths1.append(p)
-
-                    # Find the path from root to leaf2
-                    paths2 = []
-                    for p in nx.all_simple_paths(t, source=leaf2, target=root):
-                        paths2.append(p)
-
-                    # Combine the two paths (excluding the root from one of them to avoid duplication)
-                    full_paths = []
-                    for p1 in paths1:
-                        for p2 in paths2:
-                            fp = p1 + p2[::-1][1:]
-                            full_paths.append(fp)
-
-                    return full_paths
-
                 # Find all leaf nodes (nodes with only one neighbor) that are entanglement devices
                 # leaf_nodes = [node for node in t.nodes() if t.degree(node) == 1 and is_ent_device(node)]
                 leaf_nodes = [node for node in t.nodes() if t.in_degree(node) == 0 and is_ent_device(node)]
 
-                # Find all pairs in the leaf_nodes list
-                pairs = list(itertools.combinations(leaf_nodes, 2))
+                # Find all paths from each leaf to the root once, to be combined per pair
+                paths_to_root = {leaf: list(nx.all_simple_paths(t, source=leaf, target=root)) for leaf in leaf_nodes}
 
                 links = []
-                for p in pairs:
-                    # # Find the path between two leaf nodes
-                    # path = nx.shortest_path(G, source=p[0], target=p[1])
-
-                    leaf1 = p[0]
-                    leaf2 = p[1]
-
+                for leaf1, leaf2 in itertools.combinations(leaf_nodes, 2):
                     # # Find the shortest path from leaf1 to the root
                     # shortest_path = find_shortest_path(t, leaf1, leaf2, root)
                     #
                     # # Update links and map
                     # links.append((leaf1, leaf2, {'nodes': shortest_path}))
-                    # # link_path_map.update({(leaf1, leaf2): shortest_path})
 
-                    # Find all paths
-                    all_paths = find_all_paths(t, leaf1, leaf2, root)
-                    for p in all_paths:
-                        links.append((leaf1, leaf2, {'nodes': p}))
+                    # Combine the two paths (excluding the root from one of them to avoid duplication)
+                    # The nodes are kept in self._ent_paths and the link only stores their index
+                    for p1 in paths_to_root[leaf1]:
+                        for p2 in paths_to_root[leaf2]:
+                            ent_paths.append(tuple(p1 + p2[-2::-1]))
+                            links.append((leaf1, leaf2, {'path_idx': len(ent_paths) - 1}))
 
                 return links
 
             # Get the tree from bsm
-            t = generate_bsm_tree(bsm, g)
+            t = generate_bsm_tree(bsm, g, pred_map)
             # draw_and_save_graph(t)
 
             # List all entanglement links using bsm
@@ -443,31 +421,41 @@ class NetworkGenerator:
             return ent_links
 
         def extract_quantum_links(g):
-            # Create a new graph with only quantum links
-            d = nx.node_link_data(g, edges="edges")
-            qls = [link for link in d['edges'] if link['title'] == "quantum"]
-            d['edges'] = qls
-            return nx.node_link_graph(d, edges="edges")
+            # Create a new graph with all the nodes but only quantum links
+            q_graph = g.__class__()
+            q_graph.graph.update(g.graph)
+            q_graph.add_nodes_from(g.nodes(data=True))
+            edges = g.edges(keys=True, data=True) if g.is_multigraph() else g.edges(data=True)
+            q_graph.add_edges_from(e for e in edges if e[-1].get("title") == "quantum")
+            return q_graph
 
         # Convert to a graph with only quantum links
         q_graph = extract_quantum_links(graph)
 
         # Create the entanglemnt graph
+        # In-edges of every node grouped by non-BSM source node, shared by all the BSM trees.
+        # The source nodes are kept in the iteration order of the set of in-edge sources
+        def in_edges_by_neighbor(n):
+            pred = q_graph.pred[n]
+            neighbors = set(src for src, _, _ in q_graph.in_edges(n, keys=True))
+            return [(nbr, [(nbr, n, key) for key in pred[nbr]]) for nbr in neighbors if not is_bsm_device(nbr)]
+
+        pred_map = {n: in_edges_by_neighbor(n) for n in q_graph}
+
         ent_graph = nx.MultiGraph()
-        for n in q_graph.nodes():
-            if is_ent_device(n):
-                ent_graph.add_node(n)
-            elif is_bsm_device(n):
-                ent_links = generate_ent_links(n, q_graph)
-                ent_graph.add_edges_from(ent_links)
-            else:
-                continue
+        ent_graph.add_nodes_from(n for n in q_graph if is_ent_device(n))
+        for n in q_graph:
+            if is_bsm_device(n):
+                ent_graph.add_edges_from(generate_ent_links(n, q_graph, pred_map))
 
         return ent_graph
 
     def find_route(self, src, dst, ent_link=False, **kwargs):
         """ Return the routes between src and dst nodes
 
+        Routes are memoized per (src, dst, ent_link, algorithm) until the
+        topology is reset or refreshed.
+
         :param src: src node
         :type src: str
         :param dst: dst node
@@ -480,15 +468,26 @@ class NetworkGenerator:
         :rtype: list
 
         """
-
-        router_types = ["QRepeater", "QRouter"]
-        node_info_map = self._node_info_map
-
-        def get_device_type(n):
-            return node_info_map.get(n)["systemSettings"]["type"]
-
-        def is_router_device(n):
-            return get_device_type(n) in router_types
+        algo_dict = kwargs.get("algorithm", None)
+        if algo_dict and not isinstance(algo_dict, dict):
+            raise TypeError("the algorithm must be dict")
+
+        key = (src, dst, ent_link, algo_dict["name"] if algo_dict else None)
+        routes = self._route_cache.get(key)
+        if routes is None:
+            routes = self._find_route(src, dst, ent_link, algo_dict)
+            if routes is None:
+                # The routing algorithm failed, retry on the next call rather than memoize the failure
+                return []
+            self._route_cache[key] = routes
+        # Hand out copies, callers may modify the routes they get
+        return [list(r) for r in routes]
+
+    def _find_route(self, src, dst, ent_link, algo_dict):
+        """ Calculate the routes between src and dst nodes, see find_route()
+
+        Return None, instead of a list of routes, when the routing algorithm failed
+        """
 
         def is_valid_route(hops: list):
             if len(hops) <= 1:
@@ -504,17 +503,15 @@ class NetworkGenerator:
                 and exclude any paths containing non-router devices in the middle.
             """
             route_set = []
+            seen = set()
             for r in raw_routes:
-                valid = True
-                if len(r) > 2:
-                    for n in r[1:-1]:
-                        valid = is_router_device(n)
-                        if not valid:
-                            break
-                if not valid:
+                # all intermediate nodes must be routers
+                if not all(map(is_router_device, itertools.islice(r, 1, len(r) - 1))):
                     continue
 
-                if r not in route_set:
+                key = tuple(r)
+                if key not in seen:
+                    seen.add(key)
                     route_set.append(r)
 
             return route_set
@@ -524,10 +521,7 @@ class NetworkGenerator:
 
         # Set the algorithm and parameters if presented;
         # Otherwise use the default
-        algo_dict = kwargs.get("algorithm", None)
         if algo_dict:
-            if not isinstance(algo_dict, dict):
-                raise TypeError("the algorithm must be dict")
             if algo_dict["name"] == RALG.shortest.value:
                 algo = nx.shortest_path
             elif algo_dict["name"] == RALG.all_shortest.value:
@@ -540,7 +534,16 @@ class NetworkGenerator:
             algo = None
 
         # Set the graph: entanglement or default graph
-        graph = self.ent_graph if ent_link else self.graph.to_undirected()
+        graph = self.ent_graph if ent_link else self.undirected_graph
+        # Only bound once the graph, and with it the device classification, is built
+        is_router_device = self._is_router.__getitem__
+
+        # Return early when the nodes are unknown or disconnected rather than
+        # unwinding a NetworkX exception from the routing algorithm
+        if src not in graph or dst not in graph:
+            return []
+        if algo is not nx.all_simple_paths and not nx.has_path(graph, src, dst):
+            return []
 
         # Calculate routes between src and dst nodes
         try:
@@ -552,38 +555,47 @@ class NetworkGenerator:
             import traceback
             traceback.print_exc()
             logger.error(f"error {e}")
-            return []
+            return None
 
         # Handle single hop case here so we know the graph is generated
         # before any hop resolution takes place
         if src == dst:
             return raw_routes
 
+        # A single shortest path over the physical graph needs no filtering or expansion
+        if not ent_link and (algo is None or algo is nx.shortest_path):
+            return raw_routes
+
         filtered_routes = do_filter(raw_routes) if ent_link else raw_routes
 
+        # The shortest path picked may cross a non-router device while another
+        # shortest path of the same length does not, fall back to the latter
+        if ent_link and not filtered_routes and algo in (None, nx.shortest_path):
+            route = next((r for r in nx.all_shortest_paths(graph, src, dst)
+                          if all(map(is_router_device, r[1:-1]))), None)
+            filtered_routes = [route] if route else []
+
         routes_in_hops = []
         for r in filtered_routes:
             routes_in_hops.append(get_hops(r))
 
         # Expand nodes involved in establishing entanglement links along the routes
         routes = []
+        seen_routes = set()
         for hops in routes_in_hops:
+            if not hops:
+                continue
 
-            subroutes = []
-            for hop in hops:
-                ps = self.get_nodes_in_ent_link(hop) if ent_link else [list(hop)]
-                if subroutes == []:
-                    subroutes = ps
-                else:
-                    update = []
-                    for r in subroutes:
-                        for p in ps:
-                            nr = r + p[1:]
-                            update.append(nr)
-                    subroutes = update
-            for s in subroutes:
-                if s not in routes:
-                    routes.append(s)
+            # Every combination of one node path per hop makes a route
+            hop_options = [self._ent_link_nodes(hop) if ent_link else [hop] for hop in hops]
+            for combo in itertools.product(*hop_options):
+                route = list(combo[0])
+                for segment in combo[1:]:
+                    route.extend(segment[1:])
+                key = tuple(route)
+                if key not in seen_routes:
+                    seen_routes.add(key)
+                    routes.append(route)
 
         return routes
 
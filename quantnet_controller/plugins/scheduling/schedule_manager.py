@@ -1,53 +1,75 @@
 # -*- coding: utf-8 -*-
 
 import logging
-import json
+from bitarray.util import hex2ba, zeros
 from quantnet_mq import Code
+from quantnet_controller.common.utils import json_loads
 import asyncio
 
 log = logging.getLogger(__name__)
 
 
+def timeslots_to_bits(timeslots, num_slots):
+    """Convert a hex encoded timeslot availability into a bitarray of num_slots bits, or of as
+    many bits as the value needs when it does not fit in num_slots"""
+    bits = hex2ba(timeslots[2:] if timeslots[:2].lower() == "0x" else timeslots)
+    first = bits.find(1)
+    size = max(num_slots, len(bits) - first if first >= 0 else 0)
+    if size > len(bits):
+        return zeros(size - len(bits)) + bits
+    return bits[len(bits) - size:]
+
+
 class ScheduleManager():
-    def __init__(self, rpcclient, rtype="function", key="agentId", **kwargs):
+    def __init__(self, rpcclient, rtype="function", key="agentId", max_concurrency=64, **kwargs):
         # self._function_tasks = []
         self._rpcclient = rpcclient
+        # Bound the number of in-flight agent RPCs across all fan-out calls
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _bounded_call(self, agent_id, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) under the concurrency limit and pair the result, or the
+        raised exception, with agent_id"""
+        async with self._semaphore:
+            try:
+                return agent_id, await fn(*args, **kwargs)
+            except Exception as e:
+                return agent_id, e
 
     async def get_schedule(self, agent_id, param, timeout=5.0):
         log.info(f"getting schedule from {agent_id}")
         submitResp = await self._rpcclient.call(
             "scheduler.getSchedule", param, topic=f"rpc/{agent_id}", timeout=timeout
         )
-        submitResp = json.loads(submitResp)
+        submitResp = json_loads(submitResp)
         return submitResp
 
     async def get_timeslots(self, agent_ids, param, timeout=5):
         log.info(f"Fetching timeslots from agents {agent_ids}")
         slots = {}
-        timeslot_futures = {}
-        for agent_id in agent_ids:
-            fut = self.get_schedule(agent_id, param, timeout=timeout)
-            timeslot_futures[agent_id] = fut
-
-        try:
-            results = await asyncio.gather(*timeslot_futures.values(), return_exceptions=True)
-
-            for agent_id, result in zip(timeslot_futures.keys(), results):
-                if isinstance(result, Exception):
-                    log.error(f"Failed to get timeslot from agent {agent_id}: {result}")
-                    raise Exception("Failed to get timeslot from agents")
-
-                if result is not None and result["status"]["code"] == Code.OK.value:
-                    slots[agent_id] = bin(int(result["payload"]["timeslots"], 16))[2:].zfill(param["numSlots"])
-                else:
-                    log.error(f"Failed to get timeslot from agent {agent_id}")
-                    raise Exception("Failed to get timeslot from agents")
-
-        except Exception as e:
-            log.error(f"Exception occurred while gathering timeslots: {e}")
-            raise
-
-        return slots
+        failed = []
+        tasks = [
+            asyncio.create_task(self._bounded_call(agent_id, self.get_schedule, agent_id, param, timeout=timeout))
+            for agent_id in agent_ids
+        ]
+
+        for fut in asyncio.as_completed(tasks):
+            agent_id, result = await fut
+            if isinstance(result, Exception):
+                log.error(f"Failed to get timeslot from agent {agent_id}: {result}")
+                failed.append(agent_id)
+            elif result is not None and result["status"]["code"] == Code.OK.value:
+                slots[agent_id] = timeslots_to_bits(result["payload"]["timeslots"], param["numSlots"])
+            else:
+                log.error(f"Failed to get timeslot from agent {agent_id}")
+                failed.append(agent_id)
+
+        if failed:
+            log.error(f"Exception occurred while gathering timeslots from agents {failed}")
+            raise Exception("Failed to get timeslot from agents")
+
+        # Keep the order of the requested agents
+        return {agent_id: slots[agent_id] for agent_id in agent_ids}
 
     async def _call_cancel_exp(self, agent_id, exp_id, timeout=5.0):
         log.info(f"Submit cancel schedule from {agent_id}")
@@ -55,7 +77,7 @@ class ScheduleManager():
             submitResp = await self._rpcclient.call(
                 "experiment.cancel", {"exp_id": exp_id}, topic=f"rpc/{agent_id}", timeout=timeout
             )
-            submitResp = json.loads(submitResp)
+            submitResp = json_loads(submitResp)
             return submitResp
         except TimeoutError:
             return None
@@ -63,22 +85,14 @@ class ScheduleManager():
     async def cancel_tasks(self, exp_id, agent_Ids, timeout=5):
         log.info(f"Cancelling experiment {exp_id}")
         # Experiment.update(exp_id, key="phase", value="cancelling")
-        aws = {}
-
-        for agent_id in agent_Ids:
-            aws[agent_id] = self._call_cancel_exp(agent_id, exp_id, timeout=timeout)
-
-        try:
-            results = await asyncio.gather(*aws.values(), return_exceptions=True)
-
-            for agent_id, result in zip(aws.keys(), results):
-                if result is not None and result["status"]["code"] == Code.OK.value:
-                    continue
-                else:
-                    log.error(f"Failed to cancel experiment in agent {agent_id}: {result}")
-
-        except Exception as e:
-            log.error(f"Exception occurred while canceling experiments: {e}")
-            raise
+        tasks = [
+            asyncio.create_task(self._bounded_call(agent_id, self._call_cancel_exp, agent_id, exp_id, timeout=timeout))
+            for agent_id in agent_Ids
+        ]
+
+        for fut in asyncio.as_completed(tasks):
+            agent_id, result = await fut
+            if isinstance(result, Exception) or result is None or result["status"]["code"] != Code.OK.value:
+                log.error(f"Failed to cancel experiment in agent {agent_id}: {result}")
 
         # Experiment.update(exp_id, key="phase", value="Failed to cancel")
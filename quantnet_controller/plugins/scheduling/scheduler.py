@@ -1,39 +1,31 @@
 import aioschedule as schedule
 import asyncio
 import logging
-from queue import Queue
+from collections import deque
 from quantnet_mq import Code
 
 logger = logging.getLogger("plugins.scheduler")
 
 
 class JobDesciption:
-    def __init__(self, job, repeat, interval, duration) -> None:
+    __slots__ = ("job", "remaining", "interval", "duration", "done")
+
+    def __init__(self, job, remaining, interval, duration) -> None:
         self.job = job
-        self.repeat = repeat
+        self.remaining = remaining
         self.interval = interval
         self.duration = duration
+        self.done = False
 
 
 class Scheduler:
     def __init__(self):
-        self._jobs = Queue()
-        self._jobs.put(None)
+        self._jobs = deque()
 
     async def run(self, interval=1):
         while True:
             await schedule.run_pending()
             await asyncio.sleep(interval)
-            # check if job repeat counter is less than 1, and remove the job
-            while True:
-                jobdisc = self._jobs.get()
-                if jobdisc is None:
-                    self._jobs.put(None)
-                    break
-                elif jobdisc.repeat[0] < 1:
-                    schedule.cancel_job(jobdisc.job)
-                else:
-                    self._jobs.put(jobdisc)
 
     def start(self):
         logger.info("Scheduler is started")
@@ -60,19 +52,18 @@ class Scheduler:
             if repeat == 1:
                 return Code.OK
 
-            # change repeat counter to a mutable object
-            repeat = [repeat - 1]
-
             async def func_wrapper(func, args):
                 await func(args)
-                repeat[0] = repeat[0] - 1
-                # not working in aioschedule
-                # workaround: create a queue to maintain counter and decrement each time the function is called
-                return schedule.cancel_job
+                jobdesc.remaining -= 1
+                # cancel the job once its repeat counter is used up
+                if jobdesc.remaining < 1 and not jobdesc.done:
+                    jobdesc.done = True
+                    schedule.cancel_job(jobdesc.job)
+                    self._jobs.remove(jobdesc)
 
             job = schedule.every(interval).seconds.do(func_wrapper, func, args)
-            jobdesc = JobDesciption(job, repeat, interval, duration)
-            self._jobs.put(jobdesc)
+            jobdesc = JobDesciption(job, repeat - 1, interval, duration)
+            self._jobs.append(jobdesc)
             return Code.OK
 
     def stop(self):
@@ -10,8 +10,9 @@ import logging
 import uvloop
 import importlib
 import inspect
-from typing import Optional
-from types import FrameType
+import functools
+from contextlib import contextmanager
+from itertools import chain
 from quantnet_mq.msgserver import MsgServer
 from quantnet_mq.msgclient import MsgClient
 from quantnet_mq.rpcserver import RPCServer
@@ -24,7 +25,38 @@ from quantnet_mq.schema.models import Schema
 
 
 logger = logging.getLogger(__name__)
-asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
+# Package name the plugin modules are registered under in sys.modules
+PLUGIN_NAMESPACE = "quantnet_plugins"
+
+
+def _scan_plugin_dirs(dirname):
+    """Return all the subfolders of dirname, excluding __pycache__, in a single walk"""
+    subfolders = []
+    for root, dirs, _ in os.walk(dirname, followlinks=False):
+        dirs[:] = [d for d in dirs if d != "__pycache__"]
+        subfolders.extend(os.path.join(root, d) for d in dirs)
+    return tuple(subfolders)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_schema(path, ns=None):
+    """Load a schema file or folder into the protocol namespaces once per process"""
+    Schema.load_schema(path, ns=ns)
+
+
+@contextmanager
+def _scoped_syspath(path):
+    """Make the modules in path importable for the duration of the block"""
+    sys.path.append(path)
+    try:
+        yield
+    finally:
+        # The entry appended above is normally still the last one
+        if sys.path and sys.path[-1] == path:
+            sys.path.pop()
+        else:
+            sys.path.remove(path)
 
 
 class QuantnetServer:
@@ -32,6 +64,7 @@ class QuantnetServer:
         self.started = False
         self.should_exit = False
         self.force_exit = False
+        self._exit_event = asyncio.Event()
         self._dispatchers = {}
         self._params = {}
         self.ctx = ControllerContextManager(config=config)
@@ -46,26 +79,33 @@ class QuantnetServer:
 
     def load_schema(self, path):
         if path:
-            Schema.load_schema(path)
+            for p in ([path] if isinstance(path, str) else path):
+                _load_schema(os.path.abspath(p))
         logger.info(f"Server started with protocol namespaces:\n{Schema()}")
 
     def load_modules(self, ns, path):
+        # Register plugins under a private package so they never shadow a top-level module
+        ns = f"{PLUGIN_NAMESPACE}.{ns}"
+
+        # Reuse the module if this file was already loaded under the namespace
+        modules = sys.modules.get(ns)
+        if modules is not None and getattr(modules, "__file__", None) == path:
+            return modules
+
         module_spec = importlib.util.spec_from_file_location(ns, path)
         modules = importlib.util.module_from_spec(module_spec)
-        module_spec.loader.exec_module(modules)
+        sys.modules[ns] = modules
+        try:
+            module_spec.loader.exec_module(modules)
+        except BaseException:
+            sys.modules.pop(ns, None)
+            raise
         return modules
 
     def load_plugins(self, plugin_path):
-        def is_plugin_module(module, cls):
-            return issubclass(module, cls) and not module == cls
-
-        def fast_scandir(dirname):
-            if not dirname:
-                return []
-            subfolders = [f for f in os.scandir(dirname) if f.is_dir() if f.name != "__pycache__"]
-            for dirname in list(subfolders):
-                subfolders.extend(fast_scandir(dirname))
-            return subfolders
+        def is_plugin_module(module, bases):
+            # A plugin class derives from one of the bases without being one of them
+            return module not in bases and not bases.isdisjoint(module.__mro__)
 
         if isinstance(plugin_path, str):
             plugin_path = [plugin_path]
@@ -79,55 +119,66 @@ class QuantnetServer:
             MonitoringPlugin: ("monitor", lambda module: module.__name__ == self.ctx.config.monitor),
             ProtocolPlugin: ("protocols", lambda module: True)
         }
+        plugin_bases = plugin_mappings.keys()
 
         for path in plugin_path:
+            if not path:
+                continue
             # loading plugins
-            for plugin in [f for f in fast_scandir(path) if f.is_dir()]:
+            for plugin in _scan_plugin_dirs(path):
+                if not os.path.isfile(plugin + "/__init__.py"):
+                    continue
+
                 try:
-                    sys.path.append(plugin.path)
-                    if not os.path.isfile(plugin.path + "/__init__.py"):
-                        continue
-
-                    plugin_modules = self.load_modules(os.path.basename(plugin.path), plugin.path + "/__init__.py")
-
-                    for module_name in dir(plugin_modules):
-                        module = getattr(plugin_modules, module_name)
-                        if not inspect.isclass(module):
-                            continue
-
-                        # Check each plugin type with appropriate conditional logic
-                        for plugin_type, (attr_name, condition) in plugin_mappings.items():
-                            if is_plugin_module(module, plugin_type) and condition(module):
-                                if attr_name == "protocols":
-                                    self.ctx.protocols[module_name] = module(self.ctx)
-                                else:
-                                    setattr(self.ctx, attr_name, module(self.ctx))
-                                break  # Stop after first match to avoid duplicate loading
+                    with _scoped_syspath(plugin):
+                        plugin_modules = self.load_modules(os.path.basename(plugin), plugin + "/__init__.py")
+
+                        for module_name, module in list(vars(plugin_modules).items()):
+                            if not inspect.isclass(module) or not is_plugin_module(module, plugin_bases):
+                                continue
+
+                            # Check each plugin type of the class with appropriate conditional logic
+                            for base in module.__mro__:
+                                if base not in plugin_mappings:
+                                    continue
+                                attr_name, condition = plugin_mappings[base]
+                                if condition(module):
+                                    if attr_name == "protocols":
+                                        self.ctx.protocols[module_name] = module(self.ctx)
+                                    else:
+                                        setattr(self.ctx, attr_name, module(self.ctx))
+                                    break  # Stop after first match to avoid duplicate loading
 
                 except (ModuleNotFoundError, SyntaxError, NameError) as e:
-                    logger.error(f"Problem with module import for {plugin.path}: {e}")
+                    logger.error(f"Problem with module import for {plugin}: {e}")
                     continue
                 except Exception as e:
                     logger.error(f"Failed to load plugin {plugin} - {e}")
                     continue
-                finally:
-                    sys.path.remove(plugin.path)
 
-        logger.info("Loaded modules:")
+        # Refresh the import finder caches once, after all the plugins are loaded
+        importlib.invalidate_caches()
+
         # register and list all modules
-        for _, v in (self.ctx.protocols | self.ctx.plugins).items():
-            if v is None:
-                continue
-            for e in v.get_client_commands():
-                self.ctx.rpcclient.set_handler(e[0], e[1], e[2])
-            for e in v.get_server_commands():
-                self.ctx.rpcserver.set_handler(e[0], e[1], e[2])
-            for e in v.get_msg_commands():
-                self.ctx.msgserver.subscribe(e[0], e[1])
-            print(v)
+        registered = [v for v in chain(self.ctx.protocols.values(), self.ctx.plugins.values()) if v is not None]
+        client_cmds = [e[:3] for e in chain.from_iterable(v.get_client_commands() for v in registered)]
+        server_cmds = [e[:3] for e in chain.from_iterable(v.get_server_commands() for v in registered)]
+        msg_cmds = [e[:2] for e in chain.from_iterable(v.get_msg_commands() for v in registered)]
+        for e in client_cmds:
+            self.ctx.rpcclient.set_handler(*e)
+        for e in server_cmds:
+            self.ctx.rpcserver.set_handler(*e)
+        for e in msg_cmds:
+            self.ctx.msgserver.subscribe(*e)
+        for v in registered:
+            logger.debug(f"Loaded module {v}")
+        logger.info(f"Loaded {len(registered)} modules")
 
     def run(self) -> None:
         # self.config.setup_event_loop()
+        if hasattr(uvloop, "run"):
+            return uvloop.run(self.serve())
+        # uvloop < 0.18 has no run(), install its policy instead
         asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
         return asyncio.run(self.serve())
 
@@ -199,22 +250,24 @@ class QuantnetServer:
         _start_plugins()
 
     async def main_loop(self) -> None:
-        counter = 0
-        should_exit = self.should_exit
-        while not should_exit:
-            counter += 1
-            counter = counter % 864000
-            await asyncio.sleep(0.1)
-            should_exit = self.should_exit
+        # Sleep until handle_exit() signals the shutdown
+        await self._exit_event.wait()
 
     async def shutdown(self) -> None:
         logger.info("Shutting down")
 
+        # Let the protocol plugins release their resources, awaiting the ones doing it asynchronously
+        for protocol in (self.ctx.protocols or {}).values():
+            res = protocol.destroy()
+            if inspect.isawaitable(res):
+                await res
+
         await self.ctx.rpcserver.stop()
         await self.ctx.msgserver.stop()
 
-    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+    def handle_exit(self, sig: int, frame=None) -> None:
         if self.should_exit and sig == signal.SIGINT:
             self.force_exit = True
         else:
             self.should_exit = True
+        self._exit_event.set()
@@ -8,6 +8,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Modules loaded by import_classes_from_package, keyed on their file path
+_loaded_modules = {}
+
 
 def import_classes_from_package(directory_path: str = None, package_name: str = "package"):
     """
@@ -27,23 +30,29 @@ def import_classes_from_package(directory_path: str = None, package_name: str =
     """
 
     # Get the list of Python files (.py) in the specified directory
-    python_files = [f[:-3] for f in os.listdir(directory_path) if f.endswith('.py')]
+    with os.scandir(directory_path) as it:
+        python_files = [e for e in it if e.name.endswith('.py') and e.is_file()]
     allclasses = {}
 
     # Iterate over each Python file and import its contents dynamically
-    for file_name in python_files:
+    for entry in python_files:
+        file_name = entry.name[:-3]
         try:
-            # Construct the full path to the Python file
-            file_path = os.path.join(directory_path, f"{file_name}.py")
+            # The directory entry already carries the full path to the Python file
+            file_path = entry.path
 
-            # Create a module spec for the file
-            spec = importlib.util.spec_from_file_location(file_name, file_path)
+            # Reuse the module if the file has already been loaded
+            module = _loaded_modules.get(file_path)
+            if module is None:
+                # Create a module spec for the file
+                spec = importlib.util.spec_from_file_location(file_name, file_path)
 
-            # Create the module object
-            module = importlib.util.module_from_spec(spec)
+                # Create the module object
+                module = importlib.util.module_from_spec(spec)
 
-            # Load the module
-            spec.loader.exec_module(module)
+                # Load the module
+                spec.loader.exec_module(module)
+                _loaded_modules[file_path] = module
 
             # Iterate over the attributes of the module
             for name, obj in vars(module).items():
@@ -1,12 +1,22 @@
 import os
 import sys
-import json
+import ast
 import asyncio
 import uuid
 from quantnet_mq.rpcclient import RPCClient
 from quantnet_mq.msgserver import MsgServer
 from quantnet_mq.schema.models import Schema
 
+try:
+    from uvloop import run
+except ImportError:
+    from asyncio import run
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 ret = None
 
 
@@ -15,6 +25,7 @@ class MyPingPonger():
         self._dests = destinations
         self._iters = iters
         self._pending = len(self._dests)
+        self._done = asyncio.Event()
         self._token = str(uuid.uuid4())
 
     async def start_pingpong(self, client):
@@ -22,12 +33,12 @@ class MyPingPonger():
                "iterations": self._iters,
                "token": self._token}
         ret = await client.call("pingpong", msg, timeout=20.0)
-        ret = json.loads(ret)
+        ret = json_loads(ret)
         return ret
 
     async def handle_pong(self, msg):
         from quantnet_mq.schema.models import pingpong
-        res = pingpong.pingPongRecord(**json.loads(msg))
+        res = pingpong.pingPongRecord(**json_loads(msg))
         print(f"--- {res.agent} ping statistics ---")
         print(f"{res.iterations} requests made, {res.successes} received, time {(res.end_ts-res.start_ts)*1e3:.0f}ms")
         if res.successes:
@@ -37,11 +48,13 @@ class MyPingPonger():
             rtt_mdev = float(res.rtt_mdev)
             print(f"rtt min/avg/max/mdev {rtt_min:.3f}/{rtt_avg:.3f}/{rtt_max:.3f}/{rtt_mdev:.3f} ms")
             try:
-                msg = eval(str(res.result))
+                msg = res.result if isinstance(res.result, dict) else ast.literal_eval(str(res.result))
                 print(f"message: {msg.get('message')}")
             except Exception:
                 pass
         self._pending -= 1
+        if self._pending <= 0:
+            self._done.set()
 
     async def main(self):
         # Setup RPC client with our PingPong schema
@@ -59,8 +72,8 @@ class MyPingPonger():
         res = await self.start_pingpong(client)
 
         # Wait for pong responses (as received at controller)
-        while (self._pending > 0):
-            await asyncio.sleep(1)
+        if self._pending > 0:
+            await self._done.wait()
 
 
 if __name__ == "__main__":
@@ -68,4 +81,4 @@ if __name__ == "__main__":
         dests = [d for d in sys.argv[1:]]
     else:
         dests = ["LBNL-SWITCH", "UCB-SWITCH", "UCB-Q", "LBNL-Q"]
-    asyncio.run(MyPingPonger(dests, iters=5).main())
+    run(MyPingPonger(dests, iters=5).main())
@@ -4,6 +4,11 @@ import asyncio
 from quantnet_mq.rpcclient import RPCClient
 from quantnet_mq.schema.models import Schema
 
+try:
+    from uvloop import run
+except ImportError:
+    from asyncio import run
+
 
 class MySPG():
     def __init__(self, nodes, rate, duration):
@@ -40,4 +45,4 @@ if __name__ == "__main__":
     nodes = ["LBNL-Q", "UCB-Q"]
     rate = 100
     duration = 30
-    asyncio.run(MySPG(nodes, rate, duration).main())
+    run(MySPG(nodes, rate, duration).main())
@@ -1,49 +1,121 @@
 """Unit test package for quantnet_controller."""
 
 import os
+import copy
+import functools
+from contextlib import contextmanager
+from pathlib import Path
 import logging
-import json
+import pytest
 import quantnet_mq.schema
 from quantnet_controller.common.constants import Constants
 from quantnet_controller.common.config import config_get, config_set
-from quantnet_controller.common.utils import replace_resource_uri
+from quantnet_controller.common.extra import import_extras
+from quantnet_controller.common.utils import generate_uuid, replace_resource_uri, json_loads
 from quantnet_controller.core import AbstractDatabase, DBmodel
+from quantnet_controller.db.broker import MongoBroker
+from quantnet_controller.db.nosql import collection
+from quantnet_controller.db.nosql.db import DBLoader
 
+EXTRA_MODULES = import_extras(["mongomock"])
 
+
+# The log format of every test module is set once in pytest.ini
 logger = logging.getLogger(__name__)
-log_format = \
-    '%(asctime)s - %(name)s - {%(filename)s:%(lineno)d} - [%(threadName)s] - %(levelname)s - %(message)s'
-logging.basicConfig(handlers=[logging.StreamHandler()], format=log_format, force=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_json(path):
+    """Parse the JSON file at path from its raw bytes, with orjson when it is installed"""
+    return json_loads(Path(path).read_bytes())
 
 
 class QuantnetTest():
-    def setup(self):
-        global logger
-        self._log = logger
-        self._test_dburi = os.getenv("QUANTNET_TEST_DBURI", Constants.DEFAULT_TEST_DB_URI)
 
-        self._node_path = os.path.normpath(
+    @pytest.fixture(scope="class", autouse=True)
+    def database(self, request):
+        """Set up the test database before the first test of the class, drop it after the last one"""
+        request.cls.setup_class_once()
+        yield
+        request.cls._db.drop_database()
+
+    @pytest.fixture(autouse=True)
+    def cleanup(self):
+        yield
+        self.cleanup_test()
+
+    @classmethod
+    def setup_class_once(cls):
+        """Point the test class at an empty test database, once per class"""
+        cls._log = logger
+        cls._test_dburi = os.getenv("QUANTNET_TEST_DBURI", Constants.DEFAULT_TEST_DB_URI)
+
+        # Give every pytest-xdist worker its own database so they can run in parallel
+        worker = os.getenv("PYTEST_XDIST_WORKER")
+        dbname = f"{Constants.DEFAULT_TEST_DB_NAME}_{worker}" if worker else Constants.DEFAULT_TEST_DB_NAME
+        if worker:
+            cls._test_dburi = replace_resource_uri(cls._test_dburi, dbname)
+
+        cls._node_path = os.path.normpath(
             os.path.join(quantnet_mq.schema.__path__[0], "examples/topology"))
 
-        self._node_configs = ["conf_lbnl-q.json",
-                              "conf_lbnl-bsm.json"]
+        cls._node_configs = ["conf_lbnl-q.json",
+                             "conf_lbnl-bsm.json"]
 
         try:
             dburi = config_get("database", "default")
-            dburi = replace_resource_uri(dburi, Constants.DEFAULT_TEST_DB_NAME)
+            dburi = replace_resource_uri(dburi, dbname)
             config_set("database", "default", dburi)
         except Exception:
-            config_set("database", "default", self._test_dburi)
+            config_set("database", "default", cls._test_dburi)
 
-        self._db = AbstractDatabase()
-        self._db.drop_database()
+        # QN_TEST_DB=memory runs the suite against an in-process mongomock client instead of a MongoDB server
+        if os.getenv("QN_TEST_DB") == "memory":
+            mongomock = EXTRA_MODULES["mongomock"]
+            if mongomock is None:
+                raise Exception("QN_TEST_DB=memory requires the mongomock module")
+            if not isinstance(getattr(collection._DATABASE, "_conn", None), mongomock.MongoClient):
+                collection._DATABASE = DBLoader(engine="mongomock.MongoClient")
+
+        cls._db = AbstractDatabase()
+        cls._db.drop_database()
+
+    def cleanup_test(self):
+        """Remove what a test wrote so the next one starts from empty collections"""
+        models = (DBmodel.Node, DBmodel.Calibration, DBmodel.Blob)
+        if isinstance(self._db.get_broker(), MongoBroker):
+            # Empty the collections but keep them, and their indexes, for the next test
+            for model in models:
+                self._db.delete(model, {})
+        else:
+            for model in models:
+                self._db.drop(model)
+
+    def calibration(self, id=None):
+        """Return a new calibration document with the given, or a new, id"""
+        return {"id": id or generate_uuid(), "src": "agent1", "dst": "agent2", "power": 0.1, "light": "H"}
+
+    def _load_node_config(self, path):
+        """Return a copy of the node config at path, parsed once per test session"""
+        # The DB layer may add fields (e.g. _id) to the document, keep the cached one intact
+        return copy.deepcopy(_load_json(path))
 
     def add_nodes(self):
+        nodes = []
         for node in self._node_configs:
-            fname = os.path.join(self._node_path, node)
-            fp = open(fname)
-            data = json.load(fp)
-            self._db.add(DBmodel.Node, data)
+            config = self._load_node_config(os.path.join(self._node_path, node))
+            # A config file holds either a single node or a list of nodes
+            nodes.extend(config if isinstance(config, list) else [config])
+        return self._db.add_many(DBmodel.Node, nodes)
+
+    @contextmanager
+    def temporary_handler(self, model=DBmodel.Blob):
+        """Yield a handler of model, whose collection is dropped when leaving the with block"""
+        handler = self._db.handler(model)
+        try:
+            yield handler
+        finally:
+            handler.drop()
 
     @property
     def db(self):
@@ -1,13 +1,14 @@
 #!/usr/bin/env python3
 
 import os
+from pathlib import Path
 import logging
 import unittest
-# import asyncio
+import asyncio
 import json
 import quantnet_mq.schema
 from quantnet_controller.common.config import config_get
-from quantnet_controller.common.utils import generate_uuid
+from quantnet_controller.common.utils import generate_uuid, json_loads
 from quantnet_controller.db.sqla.bsmnode import add_bsmnode, bsmnode_exists, get_bsmnode, list_bsmnodes  # , del_bsmnode
 # from quantnet_controller.db.sqla.constants import NodeStatus, NodeType
 
@@ -21,9 +22,6 @@ NODES = ["conf_lbnl-bsm.json"]
 
 
 logger = logging.getLogger(__name__)
-log_format = \
-    '%(asctime)s - %(name)s - {%(filename)s:%(lineno)d} - [%(threadName)s] - %(levelname)s - %(message)s'
-logging.basicConfig(handlers=[logging.StreamHandler()], format=log_format, force=True)
 
 
 class TestBSMnode(unittest.IsolatedAsyncioTestCase):
@@ -31,12 +29,11 @@ class TestBSMnode(unittest.IsolatedAsyncioTestCase):
     @unittest.skipUnless(use_sqla, "Skipping this test unless use_sqla is True")
     async def test_add_bsmnode(self):
 
-        for node in NODES:
+        # Read all the node configs concurrently off the event loop
+        bufs = await asyncio.gather(*(asyncio.to_thread(Path(NODE_PATH, node).read_bytes) for node in NODES))
+        for buf in bufs:
             id = generate_uuid()
-
-            fname = os.path.join(NODE_PATH, node)
-            fp = open(fname)
-            data = json.load(fp)
+            data = json_loads(buf)
             add_bsmnode(id=id,
                         system_settings=data['systemSettings'],
                         quantum_settings=data['quantumSettings'],
@@ -26,9 +26,6 @@ NODES = ["conf_lbnl-switch.json",
 
 class TestCalibration(unittest.IsolatedAsyncioTestCase):
     logger = logging.getLogger(__name__)
-    log_format = \
-        '%(asctime)s - %(name)s - {%(filename)s:%(lineno)d} - [%(threadName)s] - %(levelname)s - %(message)s'
-    logging.basicConfig(handlers=[logging.StreamHandler()], format=log_format, force=True)
 
     async def test_add_calibration(self):
 
@@ -9,9 +9,6 @@ from quantnet_controller.core.node import Node
 
 class TestQnode(unittest.IsolatedAsyncioTestCase):
     logger = logging.getLogger(__name__)
-    log_format = \
-        '%(asctime)s - %(name)s - {%(filename)s:%(lineno)d} - [%(threadName)s] - %(levelname)s - %(message)s'
-    logging.basicConfig(handlers=[logging.StreamHandler()], format=log_format, force=True)
 
 
     async def test_list(self):
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 
 import os
+from pathlib import Path
 import logging
 import unittest
+import asyncio
 import json
 import quantnet_mq.schema
 from quantnet_controller.common.config import config_get
-from quantnet_controller.common.utils import generate_uuid
+from quantnet_controller.common.utils import generate_uuid, json_loads
 from quantnet_controller.db.sqla.qnode import add_qnode, qnode_exists, get_qnode
 
 use_sqla = True if "sql" in config_get("database", "default") else False
@@ -19,21 +21,17 @@ NODES = ["conf_simplelink-alice.json",
          "conf_simplelink-bob.json"]
 
 logger = logging.getLogger(__name__)
-log_format = \
-    '%(asctime)s - %(name)s - {%(filename)s:%(lineno)d} - [%(threadName)s] - %(levelname)s - %(message)s'
-logging.basicConfig(handlers=[logging.StreamHandler()], format=log_format, force=True)
 
 
 class TestQnode(unittest.IsolatedAsyncioTestCase):
 
     @unittest.skipUnless(use_sqla, "Skipping this test unless use_sqla is True")
     async def test_add_node(self):
-        for node in NODES:
+        # Read all the node configs concurrently off the event loop
+        bufs = await asyncio.gather(*(asyncio.to_thread(Path(NODE_PATH, node).read_bytes) for node in NODES))
+        for buf in bufs:
             id = generate_uuid()
-
-            fname = os.path.join(NODE_PATH, node)
-            fp = open(fname)
-            data = json.load(fp)
+            data = json_loads(buf)
             add_qnode(id,
                       system_settings=data['systemSettings'],
                       qubit_settings=data['qubitSettings'],
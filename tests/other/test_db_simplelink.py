@@ -19,9 +19,6 @@ NODES = ["conf_simplelink-alice.json",
          "conf_simplelink-bob.json"]
 
 logger = logging.getLogger(__name__)
-log_format = \
-    '%(asctime)s - %(name)s - {%(filename)s:%(lineno)d} - [%(threadName)s] - %(levelname)s - %(message)s'
-logging.basicConfig(handlers=[logging.StreamHandler()], format=log_format, force=True)
 
 
 class TestQnode(unittest.IsolatedAsyncioTestCase):
@@ -21,9 +21,6 @@ NODES = ["conf_lbnl-switch.json",
          "conf_ucb-switch.json"]
 
 logger = logging.getLogger(__name__)
-log_format = \
-    '%(asctime)s - %(name)s - {%(filename)s:%(lineno)d} - [%(threadName)s] - %(levelname)s - %(message)s'
-logging.basicConfig(handlers=[logging.StreamHandler()], format=log_format, force=True)
 
 
 class TestSwitch(unittest.IsolatedAsyncioTestCase):
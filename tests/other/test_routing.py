@@ -6,9 +6,6 @@ from quantnet_controller.core.managers import ResourceManager
 import networkx as nx
 
 logger = logging.getLogger(__name__)
-log_format = \
-    '%(asctime)s - %(name)s - {%(filename)s:%(lineno)d} - [%(threadName)s] - %(levelname)s - %(message)s'
-logging.basicConfig(handlers=[logging.StreamHandler()], format=log_format, force=True)
 
 
 class TestRouting(unittest.IsolatedAsyncioTestCase):
@@ -0,0 +1,36 @@
+import asyncio
+import types
+from quantnet_controller.plugins.protocols.calibration.calibrator import Calibrator
+from . import QuantnetTest
+
+
+class SlowMsgClient():
+    """ Message client recording the phases once published, the first publish is the slowest """
+
+    def __init__(self):
+        self.calls = 0
+        self.published = []
+
+    async def publish(self, topic, msg):
+        self.calls += 1
+        await asyncio.sleep(0.1 if self.calls == 1 else 0)
+        self.published.append((topic, msg["phase"]))
+
+
+class TestCalibrator(QuantnetTest):
+
+    def test_terminal_phase_after_flushed_phases(self):
+        async def run():
+            msgclient = SlowMsgClient()
+            calibrator = Calibrator(types.SimpleNamespace(rpc_client_topic="rpc"), None, msgclient)
+            calibrator._phase_flush_interval = 0
+
+            # The terminal phase is published while the flush of the previous phase is in flight
+            calibrator._publish_phase("cal", "Cleanup")
+            await asyncio.sleep(0.01)
+            await calibrator._publish_terminal_phase("cal", "Done")
+            await calibrator.close()
+            return msgclient.published
+
+        published = asyncio.run(run())
+        assert (published == [("calibration-cal", "Cleanup"), ("calibration-cal", "Done")])
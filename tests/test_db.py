@@ -2,18 +2,16 @@
 
 import pytest
 import os
-import json
 from quantnet_controller.common.utils import generate_uuid
 from quantnet_controller.core import DBmodel
+from quantnet_controller.db.broker import MongoBroker
+from quantnet_controller.db.nosql import collection
+from quantnet_controller.db.nosql.db import DBLayer
 from . import QuantnetTest
 
 
 class TestDB(QuantnetTest):
 
-    @pytest.fixture(autouse=True)
-    def setup(self):
-        super().setup()
-
     @pytest.fixture
     def nodes(self):
         yield self.add_nodes()
@@ -21,16 +19,15 @@ class TestDB(QuantnetTest):
 
     def test_list_node(self, nodes):
         try:
-            nodes = self.db.find(DBmodel.Node)
+            count = self.db.count(DBmodel.Node)
         except Exception:
             assert (False)
-        assert (len(nodes) == len(self._node_configs))
+        assert (count == len(self._node_configs))
 
     def test_get_node(self):
         try:
             fname = os.path.join(self._node_path, "conf_lbnl-q.json")
-            fp = open(fname)
-            data = json.load(fp)
+            data = self._load_node_config(fname)
             result = self.db.add(DBmodel.Node, data)
             assert (result['systemSettings']['ID'] == "LBNL-Q")
         except Exception:
@@ -42,31 +39,19 @@ class TestDB(QuantnetTest):
         except Exception:
             assert (False)
 
-        self.db.drop(DBmodel.Node)
-
     def test_add_calibration(self):
         id = generate_uuid()
-        data = {"id": id,
-                "src": "agent1",
-                "dst": "agent2",
-                "power": 0.1,
-                "light": "H"}
+        data = self.calibration(id)
 
         result = self.db.add(DBmodel.Calibration, data)
         assert (result.get("id") == id)
-        self.db.drop(DBmodel.Calibration)
 
     def test_list_calibration(self):
-        data = self.db.find(DBmodel.Calibration)
-        assert (data == [])
+        assert (self.db.count(DBmodel.Calibration) == 0)
 
     def test_get_and_drop_calibration(self):
         id = generate_uuid()
-        data = {"id": id,
-                "src": "agent1",
-                "dst": "agent2",
-                "power": 0.1,
-                "light": "H"}
+        data = self.calibration(id)
         self.db.add(DBmodel.Calibration, data)
 
         data = self.db.get(DBmodel.Calibration, {"id": id})
@@ -78,11 +63,7 @@ class TestDB(QuantnetTest):
 
     def test_update_calibration(self):
         id = generate_uuid()
-        data = {"id": id,
-                "src": "agent1",
-                "dst": "agent2",
-                "power": 0.1,
-                "light": "H"}
+        data = self.calibration(id)
         data = self.db.add(DBmodel.Calibration, data)
         assert (data.get("id") == id)
 
@@ -92,102 +73,113 @@ class TestDB(QuantnetTest):
         data = self.db.get(DBmodel.Calibration, {"id": id})
         assert (data.get("src") == "agent3")
 
-        self.db.drop(DBmodel.Calibration)
-
     def test_del_calibration(self):
         id = generate_uuid()
-        data = {"id": id,
-                "src": "agent1",
-                "dst": "agent2",
-                "power": 0.1,
-                "light": "H"}
+        data = self.calibration(id)
         self.db.add(DBmodel.Calibration, data)
 
         result = self.db.delete(DBmodel.Calibration, {"id": id})
         assert (result == 1)
-        self.db.drop(DBmodel.Calibration)
 
     def test_exist_calibration(self):
         id = generate_uuid()
-        data = {"id": id,
-                "src": "agent1",
-                "dst": "agent2",
-                "power": 0.1,
-                "light": "H"}
+        data = self.calibration(id)
         self.db.add(DBmodel.Calibration, data)
 
         result = self.db.exist(DBmodel.Calibration, {"id": id})
         assert (result is True)
-        self.db.drop(DBmodel.Calibration)
 
-    def test_DB_default_handler(self):
-        handler = self.db.handler()
+    def test_add_many_calibration(self):
+        id = generate_uuid()
+        data = self.calibration(id)
+        self.db.add(DBmodel.Calibration, data)
 
-        name = generate_uuid()
-        data = {"name": name,
-                "remote": "alice",
-                "phase": "start",
-                "reason": ""}
-        result = handler.add(data)
+        # Only the new record is returned, the existing one (same _id) is replaced
+        result = self.db.add_many(DBmodel.Calibration, [data, self.calibration()])
+        assert (len(result) == 1 and result[0].get("id") != id)
+        assert (self.db.count(DBmodel.Calibration) == 2)
 
-        id = {"name": result.get("name")}
+    def test_insert_many_history(self):
+        if not isinstance(self.db.get_broker(), MongoBroker):
+            pytest.skip("history is only kept by the Mongo layer")
 
-        result = handler.get(id)
-        assert (result.get("name") == name)
+        layer = DBLayer(collection._DATABASE.db, "history", history=True)
+        try:
+            id = generate_uuid()
+            assert (layer.insert_many([dict(self.calibration(id), ts=1), self.calibration()]) == [0, 1])
 
-        result = handler.get({"remote": "alice"})
-        assert (result.get("phase") == "start")
+            # A new revision of a record is inserted next to the previous one
+            assert (layer.insert_many([dict(self.calibration(id), ts=2)]) == [0])
+            assert (layer.count({"id": id}) == 2)
+        finally:
+            layer.drop()
 
-        result = handler.find()
-        assert (result[0].get("remote") == "alice")
+    def test_DB_default_handler(self):
+        with self.temporary_handler() as handler:
 
-        result = handler.exist(id)
-        assert (result is True)
+            name = generate_uuid()
+            data = {"name": name,
+                    "remote": "alice",
+                    "phase": "start",
+                    "reason": ""}
+            result = handler.add(data)
 
-        result = handler.exist({"remote": "alice"})
-        assert (result is True)
+            id = {"name": result.get("name")}
 
-        result = handler.exist({"remote": "charles"})
-        assert (result is False)
+            result = handler.get(id)
+            assert (result.get("name") == name)
 
-        # update
-        res = handler.update(id, key="reason", value="charliecat")
-        assert (res is True)
-        result = handler.get(id)
-        assert (result.get("name") == name)
+            result = handler.get({"remote": "alice"})
+            assert (result.get("phase") == "start")
 
-        # upsert
-        res = handler.upsert(id, {"reason": "bobcat", "phase": "end"})
-        assert (res is True)
-        result = handler.get(id)
-        assert (result.get("remote") == "alice")
+            result = handler.find()
+            assert (result[0].get("remote") == "alice")
 
-        res = handler.upsert({"remote": "alice"}, {"name": "alicecat"})
-        assert (res is True)
-        result = handler.get({"name": "alicecat"})
-        assert (result.get("name") == "alicecat")
+            result = handler.exist(id)
+            assert (result is True)
 
-        # deletes
-        result = handler.delete(id)
-        assert (result == 0)
+            result = handler.exist({"remote": "alice"})
+            assert (result is True)
 
-        result = handler.delete({"name": "alicecat"})
-        assert (result == 1)
+            result = handler.exist({"remote": "charles"})
+            assert (result is False)
+
+            # update
+            res = handler.update(id, key="reason", value="charliecat")
+            assert (res is True)
+            result = handler.get(id)
+            assert (result.get("name") == name)
+
+            # upsert
+            res = handler.upsert(id, {"reason": "bobcat", "phase": "end"})
+            assert (res is True)
+            result = handler.get(id)
+            assert (result.get("remote") == "alice")
+
+            res = handler.upsert({"remote": "alice"}, {"name": "alicecat"})
+            assert (res is True)
+            result = handler.get({"name": "alicecat"})
+            assert (result.get("name") == "alicecat")
+
+            # deletes
+            result = handler.delete(id)
+            assert (result == 0)
 
-        result = handler.get(id)
-        assert (result is None)
+            result = handler.delete({"name": "alicecat"})
+            assert (result == 1)
 
-        result = handler.find()
-        assert (result == [])
+            result = handler.get(id)
+            assert (result is None)
 
-        handler.upsert({"remote": "alice"}, {"name": "alicecat"})
-        result = handler.get({"name": "alicecat"})
-        assert (result.get("name") == "alicecat")
+            result = handler.find()
+            assert (result == [])
 
-        result = handler.drop()
-        assert (result is None)
+            handler.upsert({"remote": "alice"}, {"name": "alicecat"})
+            result = handler.get({"name": "alicecat"})
+            assert (result.get("name") == "alicecat")
 
-        result = handler.find()
-        assert (result == [])
+            result = handler.drop()
+            assert (result is None)
+            assert (handler.count() == 0)
 
-        del handler
+        assert (self.db.count(DBmodel.Blob) == 0)
@@ -7,27 +7,57 @@ class TestRM(QuantnetTest):
 
     @pytest.fixture(autouse=True)
     def setup(self):
-        super().setup()
         self.rm = ResourceManager()
 
-    @pytest.fixture
-    def nodes(self):
-        yield self.add_nodes()
-        self.db.drop(DBmodel.Node)
-
     def test_get_no_nodes(self):
         with pytest.raises(Exception) as context:
             self.rm.get_nodes("LBNL-Q")
         assert ('Node not found' in str(context))
 
-    def test_get_nodes(self, nodes):
-        result = self.rm.get_nodes("LBNL-Q", "LBNL-BSM")
-        assert (len(result) == 2)
-
     def test_find_no_nodes(self):
         result = self.rm.find_nodes()
         assert (result == [])
 
+    def test_cached_nodes_invalidated(self):
+        rm = ResourceManager(cache=True)
+        self.add_nodes()
+        assert (len(rm.get_nodes("LBNL-Q")) == 1)
+        assert (len(rm.find_nodes()) == 2)
+
+        # Writes to other models keep the cache
+        version = self.db.version(DBmodel.Node)
+        self.db.add(DBmodel.Calibration, {"id": "cal", "src": "agent1", "dst": "agent2"})
+        assert (self.db.version(DBmodel.Node) == version)
+
+        self.db.delete(DBmodel.Node, {"systemSettings.ID": "LBNL-Q"})
+        assert (self.db.version(DBmodel.Node) != version)
+        with pytest.raises(Exception) as context:
+            rm.get_nodes("LBNL-Q")
+        assert ('Node not found' in str(context))
+        assert (len(rm.find_nodes()) == 1)
+
+
+class TestRMWithNodes(QuantnetTest):
+    """Read-only lookups against nodes seeded once for the whole class"""
+
+    @pytest.fixture(scope="class")
+    def nodes(self, request, database):
+        yield request.cls().add_nodes()
+        request.cls._db.drop(DBmodel.Node)
+
+    @pytest.fixture(autouse=True)
+    def cleanup(self):
+        # The nodes are shared by the tests of the class, they are dropped by the nodes fixture
+        yield
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.rm = ResourceManager()
+
+    def test_get_nodes(self, nodes):
+        result = self.rm.get_nodes("LBNL-Q", "LBNL-BSM")
+        assert (len(result) == 2)
+
     def test_find_nodes(self, nodes):
         results = self.rm.find_nodes()
         assert (isinstance(results, list) and len(results) > 0)
@@ -0,0 +1,102 @@
+import pytest
+from unittest import mock
+import networkx as nx
+from quantnet_controller.plugins.routing.routing import NetworkGenerator, NetworkRouting, RALG
+
+
+class TopologyRM():
+    """ Resource manager serving a fixed topology to the NetworkGenerator """
+
+    def __init__(self, types, links):
+        g = nx.MultiDiGraph()
+        for n, t in types.items():
+            g.add_node(n, type=t)
+        for src, dst in links:
+            g.add_edge(src, dst, title="quantum")
+            g.add_edge(src, dst, title="classical")
+        self.topology = nx.node_link_data(g, edges="edges")
+        self._configs = [{"systemSettings": {"ID": n, "type": t}} for n, t in types.items()]
+
+    def find_nodes(self, params, dict=False):
+        return self._configs
+
+    def node_loader(self, data):
+        return data["systemSettings"]["ID"]
+
+
+class TestRouting():
+
+    @pytest.fixture
+    def network(self):
+        # Q0 reaches Q1 in two entanglement hops either through the router R0
+        # behind the optical switch S0, whose BSM nodes come first, or through the QNode Q2
+        types = {"Q0": "QNode", "Q1": "QNode", "Q2": "QNode", "R0": "QRouter",
+                 "B0": "BSMNode", "B1": "BSMNode", "B2": "BSMNode", "B3": "BSMNode",
+                 "S0": "OpticalSwitch"}
+        links = [("Q0", "B2"), ("Q2", "B2"), ("Q2", "B3"), ("Q1", "B3"),
+                 ("Q0", "S0"), ("S0", "B0"), ("R0", "B0"), ("R0", "B1"), ("Q1", "B1")]
+        return NetworkGenerator(resource_mgr=TopologyRM(types, links))
+
+    def test_ent_links(self, network):
+        links = sorted(tuple(sorted(e)) for e in network.ent_graph.edges())
+        assert (links == [("Q0", "Q2"), ("Q0", "R0"), ("Q1", "Q2"), ("Q1", "R0")])
+        assert (network.get_nodes_in_ent_link(("Q0", "R0")) == [["Q0", "S0", "B0", "R0"]])
+
+    @pytest.mark.parametrize("algorithm", [None, RALG.shortest.value])
+    def test_shortest_ent_route(self, network, algorithm):
+        kwargs = {"algorithm": {"name": algorithm}} if algorithm else {}
+        routes = network.find_route("Q0", "Q1", ent_link=True, **kwargs)
+        assert (routes == [["Q0", "S0", "B0", "R0", "B1", "Q1"]])
+
+    @pytest.mark.parametrize("algorithm", [None, RALG.shortest.value])
+    def test_shortest_ent_route_skips_non_router(self, algorithm):
+        # Same network, but the BSM nodes of the QNode Q2 come first, so the
+        # shortest path found first crosses Q2 and is filtered out
+        types = {"Q0": "QNode", "Q1": "QNode", "Q2": "QNode", "R0": "QRouter",
+                 "B2": "BSMNode", "B3": "BSMNode", "B0": "BSMNode", "B1": "BSMNode",
+                 "S0": "OpticalSwitch"}
+        links = [("Q0", "B2"), ("Q2", "B2"), ("Q2", "B3"), ("Q1", "B3"),
+                 ("Q0", "S0"), ("S0", "B0"), ("R0", "B0"), ("R0", "B1"), ("Q1", "B1")]
+        network = NetworkGenerator(resource_mgr=TopologyRM(types, links))
+        kwargs = {"algorithm": {"name": algorithm}} if algorithm else {}
+        routes = network.find_route("Q0", "Q1", ent_link=True, **kwargs)
+        assert (routes == [["Q0", "S0", "B0", "R0", "B1", "Q1"]])
+
+    def test_all_shortest_ent_routes(self, network):
+        routes = network.find_route("Q0", "Q1", ent_link=True, algorithm={"name": RALG.all_shortest.value})
+        assert (routes == [["Q0", "S0", "B0", "R0", "B1", "Q1"]])
+
+    def test_deep_bsm_tree(self):
+        # A switch chain longer than the interpreter recursion limit
+        depth = 2000
+        switches = [f"S{i}" for i in range(depth)]
+        types = {"Q0": "QNode", "Q1": "QNode", "B0": "BSMNode", **{s: "OpticalSwitch" for s in switches}}
+        links = [("Q0", switches[0]), *zip(switches, switches[1:]), (switches[-1], "B0"), ("Q1", "B0")]
+        network = NetworkGenerator(resource_mgr=TopologyRM(types, links))
+        assert (network.get_nodes_in_ent_link(("Q0", "Q1")) == [["Q0", *switches, "B0", "Q1"]])
+
+    def test_physical_route(self, network):
+        routes = network.find_route("Q0", "R0")
+        assert (routes == [["Q0", "S0", "B0", "R0"]])
+
+    def test_cached_routes_not_shared(self, network):
+        routes = network.find_route("Q0", "Q1", ent_link=True)
+        routes[0].pop()
+        routes.append(["Q0"])
+        assert (network.find_route("Q0", "Q1", ent_link=True) == [["Q0", "S0", "B0", "R0", "B1", "Q1"]])
+
+        nodes = network.get_nodes_in_ent_link(("Q0", "R0"))
+        nodes[0].reverse()
+        assert (network.get_nodes_in_ent_link(("Q0", "R0")) == [["Q0", "S0", "B0", "R0"]])
+
+    def test_qnodes(self, network):
+        network.graph  # builds the arp table the qnodes are listed from
+        qnodes = network.qnodes
+        assert (qnodes == ["Q0", "Q1", "Q2"])
+        qnodes.clear()
+        assert (network.qnodes == ["Q0", "Q1", "Q2"])
+
+    def test_failed_route_not_cached(self, network):
+        with mock.patch.object(NetworkRouting, "get_routes", side_effect=RuntimeError("transient")):
+            assert (network.find_route("Q0", "Q1", ent_link=True) == [])
+        assert (network.find_route("Q0", "Q1", ent_link=True) == [["Q0", "S0", "B0", "R0", "B1", "Q1"]])
@@ -0,0 +1,20 @@
+import os
+import importlib.util
+import pytest
+import quantnet_controller
+
+# The scheduling plugin imports its modules by their bare name, load the schedule manager the same way
+_spec = importlib.util.spec_from_file_location(
+    "schedule_manager",
+    os.path.join(os.path.dirname(quantnet_controller.__file__), "plugins", "scheduling", "schedule_manager.py"))
+schedule_manager = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(schedule_manager)
+
+
+@pytest.mark.parametrize("timeslots, num_slots", [
+    ("0x0", 8), ("ff", 8), ("0x1", 16), ("0f", 2), ("1ff", 8), ("0x1ff", 4), ("00ff", 8), ("abc", 12),
+])
+def test_timeslots_to_bits(timeslots, num_slots):
+    # Same bits as the string of the timeslot value, zero filled to num_slots
+    expected = bin(int(timeslots, 16))[2:].zfill(num_slots)
+    assert (schedule_manager.timeslots_to_bits(timeslots, num_slots).to01() == expected)